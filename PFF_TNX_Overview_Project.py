@@ -1,52 +1,35 @@
-import yfinance as yf
 import pandas as pd
 import plotly.graph_objects as go
 import dash
-from dash import dcc, html
+from dash import dcc, html, Input, Output, State, no_update
+
+from pff_fetch import fetch_corrected_dividends, fetch_history, download
+from pff_payload import encode_dates, encode_frame, enable_fast_json, scatter_trace
+from pff_shared_cache import SnapshotStore
+from pff_yield_series import trailing_yield_series
 
 def fetch_and_process_dividends(ticker="PFF"):
-    pff = yf.Ticker(ticker)
-    dividends = pff.dividends
-    dividends.index = dividends.index.tz_localize(None)
-    missing_dividends = {
-        '2020-02-03': 0.164,
-        '2022-12-15': 0.237
-    }
-    for date, amount in missing_dividends.items():
-        dividends.loc[pd.Timestamp(date)] = amount
-    dividends.sort_index(inplace=True)
-    return dividends
+    return fetch_corrected_dividends(ticker)
 
 def fetch_price_history(ticker="PFF", start_date="2023-01-01"):
-    pff = yf.Ticker(ticker)
-    price_history = pff.history(start=start_date, end=pd.Timestamp.today(), auto_adjust=False)
+    price_history = fetch_history(ticker, start=start_date, end=pd.Timestamp.today(), auto_adjust=False)
     price_history = price_history[['Open', 'High', 'Low', 'Close']]
     price_history.reset_index(inplace=True)
     return price_history
 
 def fetch_tnx_data(period='2y'):
-    tnx = yf.download(['^TNX'], period=period, auto_adjust=True)
+    tnx = download(['^TNX'], period=period, auto_adjust=True)
     tnx.reset_index(inplace=True)
     return tnx
 
 def calculate_yield_from_date(dividends, prices):
-    results = []
     num_dividends_to_sum = 12
     prices['Date'] = prices['Date'].dt.tz_localize(None)
     dividends.index = dividends.index.tz_localize(None)
-    for date, closing_price in zip(prices['Date'], prices['Close']):
-        relevant_dividends = dividends[dividends.index < date].tail(num_dividends_to_sum)
-        if len(relevant_dividends) == num_dividends_to_sum:
-            last_12_dividends_sum = relevant_dividends.sum()
-            yield_percentage = (last_12_dividends_sum / closing_price) * 100
-            results.append({
-                "Date": date,
-                "Dividend Yield": yield_percentage
-            })
-    return results
+    return trailing_yield_series(dividends, prices['Date'], prices['Close'], num_dividends_to_sum)
 
 def find_extremums_and_compare(pff_yield, tnx):
-    pff_df = pd.DataFrame(pff_yield)
+    pff_df = pff_yield.to_frame()
     tnx_df = tnx[['Date', 'Close']].rename(columns={'Close': 'TNX Close'})
     merged_df = pd.merge(pff_df, tnx_df, on='Date', how='inner')
     merged_df['Spread'] = merged_df['Dividend Yield'] - merged_df['TNX Close']
@@ -77,92 +60,155 @@ def find_extremums_and_compare(pff_yield, tnx):
 # Data Preparation
 ticker = "PFF"
 start_date = "2023-01-01"
-dividends = fetch_and_process_dividends(ticker)
-prices = fetch_price_history(ticker, start_date)
-tnx_data = fetch_tnx_data()
-yield_results = calculate_yield_from_date(dividends, prices)
-merged_df, comparison_results = find_extremums_and_compare(yield_results, tnx_data)
-
-# Create static table data
-table_data = {
-    "Metric": ["Current", "52 Wk Avg", "52 Wk High", "52 Wk Low"],
-    "PFF Yield": [
-        round(comparison_results["current_pff"], 2),
-        round(comparison_results["pff_52wk_avg"], 2),
-        round(comparison_results["pff_52wk_high"], 2),
-        round(comparison_results["pff_52wk_low"], 2)
-    ],
-    "TNX Close": [
-        round(comparison_results["current_tnx"], 2),
-        round(comparison_results["tnx_52wk_avg"], 2),
-        round(comparison_results["tnx_52wk_high"], 2),
-        round(comparison_results["tnx_52wk_low"], 2)
-    ],
-    "Spread": [
-        round(comparison_results["current_spread"], 2),
-        round(comparison_results["spread_52wk_avg"], 2),
-        round(comparison_results["spread_52wk_high"], 2),
-        round(comparison_results["spread_52wk_low"], 2)
-    ]
-}
-table_df = pd.DataFrame(table_data)
 
-# Initialize Dash app
-app = dash.Dash(__name__)
+# Every worker reads the same on-disk snapshot; one of them refreshes it when it is older than this
+REFRESH_INTERVAL = 15 * 60
+store = SnapshotStore()
 
-app.layout = html.Div([
-    dcc.Graph(
-        id='comparison-graph',
-        figure={
-            'data': [
-                go.Scatter(
-                    x=merged_df['Date'],
-                    y=merged_df['Dividend Yield'],
-                    mode='lines+markers',
-                    name='PFF Yield'
-                ),
-                go.Scatter(
-                    x=merged_df['Date'],
-                    y=merged_df['TNX Close'],
-                    mode='lines+markers',
-                    name='TNX Close'
-                ),
-                go.Scatter(
-                    x=merged_df['Date'],
-                    y=merged_df['Spread'],
-                    mode='lines+markers',
-                    name='Spread (PFF Yield - TNX Close)'
-                )
-            ],
-            'layout': go.Layout(
-                title='PFF Daily Dividend Yield vs TNX Close (From 2023-01-01 to Present)',
-                xaxis={'title': 'Date'},
-                yaxis={'title': 'Value'},
-                hovermode='x unified'
+def compute_dashboard_data():
+    dividends = fetch_and_process_dividends(ticker)
+    prices = fetch_price_history(ticker, start_date)
+    tnx_data = fetch_tnx_data()
+    yield_results = calculate_yield_from_date(dividends, prices)
+    merged_df, comparison_results = find_extremums_and_compare(yield_results, tnx_data)
+    return merged_df[['Date', 'Dividend Yield', 'TNX Close', 'Spread']], comparison_results
+
+def build_table(comparison_results):
+    table_data = {
+        "Metric": ["Current", "52 Wk Avg", "52 Wk High", "52 Wk Low"],
+        "PFF Yield": [
+            round(comparison_results["current_pff"], 2),
+            round(comparison_results["pff_52wk_avg"], 2),
+            round(comparison_results["pff_52wk_high"], 2),
+            round(comparison_results["pff_52wk_low"], 2)
+        ],
+        "TNX Close": [
+            round(comparison_results["current_tnx"], 2),
+            round(comparison_results["tnx_52wk_avg"], 2),
+            round(comparison_results["tnx_52wk_high"], 2),
+            round(comparison_results["tnx_52wk_low"], 2)
+        ],
+        "Spread": [
+            round(comparison_results["current_spread"], 2),
+            round(comparison_results["spread_52wk_avg"], 2),
+            round(comparison_results["spread_52wk_high"], 2),
+            round(comparison_results["spread_52wk_low"], 2)
+        ]
+    }
+    return pd.DataFrame(table_data)
+
+def build_comparison_figure(merged_df):
+    # Series go out as base64 typed arrays with epoch-millisecond dates (see pff_payload);
+    # the date axis is encoded once and reused by all three traces
+    dates = encode_dates(merged_df['Date'])
+    return {
+        'data': [
+            scatter_trace(
+                dates,
+                merged_df['Dividend Yield'],
+                mode='lines+markers',
+                name='PFF Yield'
+            ),
+            scatter_trace(
+                dates,
+                merged_df['TNX Close'],
+                mode='lines+markers',
+                name='TNX Close'
+            ),
+            scatter_trace(
+                dates,
+                merged_df['Spread'],
+                mode='lines+markers',
+                name='Spread (PFF Yield - TNX Close)'
             )
-        }
-    ),
-    dcc.Store(id='merged-data', data=merged_df.to_dict('records')),
-    html.Div(id='table-container', children=[
-        dcc.Graph(
-            id='comparison-table',
-            figure={
-                'data': [
-                    go.Table(
-                        header=dict(values=list(table_df.columns),
-                                    fill_color='paleturquoise',
-                                    align='left'),
-                        cells=dict(values=[table_df.Metric, table_df['PFF Yield'], table_df['TNX Close'], table_df.Spread],
-                                   fill_color='lavender',
-                                   align='left'))
-                ],
-                'layout': go.Layout(
-                    title='Comparison Table of PFF Yield, TNX Close, and Spread'
-                )
-            }
+        ],
+        'layout': go.Layout(
+            title='PFF Daily Dividend Yield vs TNX Close (From 2023-01-01 to Present)',
+            xaxis={'title': 'Date', 'type': 'date'},
+            yaxis={'title': 'Value'},
+            hovermode='x unified'
+        )
+    }
+
+def build_table_figure(table_df):
+    return {
+        'data': [
+            go.Table(
+                header=dict(values=list(table_df.columns),
+                            fill_color='paleturquoise',
+                            align='left'),
+                cells=dict(values=[table_df.Metric, table_df['PFF Yield'], table_df['TNX Close'], table_df.Spread],
+                           fill_color='lavender',
+                           align='left'))
+        ],
+        'layout': go.Layout(
+            title='Comparison Table of PFF Yield, TNX Close, and Spread'
         )
+    }
+
+def build_status(snapshot):
+    as_of = pd.Timestamp(snapshot.created, unit='s', tz='UTC').tz_convert('America/New_York')
+    if snapshot.age() < REFRESH_INTERVAL:
+        return f"Data as of {as_of:%Y-%m-%d %H:%M %Z}", {'color': 'gray'}
+    if store.last_failure is not None:
+        failed_at = pd.Timestamp(store.last_failure, unit='s', tz='UTC').tz_convert('America/New_York')
+        return (f"Stale data from {as_of:%Y-%m-%d %H:%M %Z}; the last refresh attempt failed at "
+                f"{failed_at:%H:%M %Z}, retrying...", {'color': 'firebrick'})
+    return f"Stale data from {as_of:%Y-%m-%d %H:%M %Z}, refreshing in the background...", {'color': 'darkorange'}
+
+def current_snapshot():
+    # Serve whatever snapshot is on disk straight away and reconcile in the background.
+    # Only a brand-new deployment with no snapshot at all has to wait for the first fetch.
+    # Called per request, never at import, so nothing starts in a gunicorn --preload master.
+    snapshot = store.load()
+    if snapshot is None:
+        return store.refresh(compute_dashboard_data, REFRESH_INTERVAL)
+    if snapshot.age() >= REFRESH_INTERVAL:
+        store.refresh_in_background(compute_dashboard_data, REFRESH_INTERVAL)
+    return snapshot
+
+def serve_layout():
+    snapshot = current_snapshot()
+    merged_df = snapshot.frame
+    table_df = build_table(snapshot.meta)
+    status_text, status_style = build_status(snapshot)
+
+    return html.Div([
+        html.Div(id='data-status', children=status_text, style=status_style),
+        dcc.Graph(id='comparison-graph', figure=build_comparison_figure(merged_df)),
+        dcc.Store(id='merged-data', data=encode_frame(merged_df)),
+        dcc.Store(id='snapshot-name', data=snapshot.name),
+        dcc.Interval(id='snapshot-poll', interval=5 * 1000),
+        html.Div(id='table-container', children=[
+            dcc.Graph(id='comparison-table', figure=build_table_figure(table_df))
+        ])
     ])
-])
+
+# Initialize Dash app
+enable_fast_json()
+app = dash.Dash(__name__)
+server = app.server
+app.layout = serve_layout
+
+@app.callback(
+    Output('comparison-graph', 'figure'),
+    Output('comparison-table', 'figure'),
+    Output('merged-data', 'data'),
+    Output('snapshot-name', 'data'),
+    Output('data-status', 'children'),
+    Output('data-status', 'style'),
+    Input('snapshot-poll', 'n_intervals'),
+    State('snapshot-name', 'data'),
+    prevent_initial_call=True
+)
+def reload_snapshot(n_intervals, shown_name):
+    # Swap in the new snapshot once a background refresh (in any worker) has written it
+    snapshot = current_snapshot()
+    status_text, status_style = build_status(snapshot)
+    if snapshot.name == shown_name:
+        return no_update, no_update, no_update, no_update, status_text, status_style
+    return (build_comparison_figure(snapshot.frame), build_table_figure(build_table(snapshot.meta)),
+            encode_frame(snapshot.frame), snapshot.name, status_text, status_style)
 
 if __name__ == '__main__':
     app.run_server(debug=True)
@@ -1,50 +1,32 @@
-import yfinance as yf
 import pandas as pd
 import plotly.graph_objects as go
 
+from pff_fetch import fetch_corrected_dividends, fetch_history, download
+from pff_rolling_stats import rolling_stats_frame, latest_stats_table
+from pff_yield_series import trailing_yield_series
+
 def fetch_and_process_dividends(ticker="PFF"):
-    pff = yf.Ticker(ticker)
-    dividends = pff.dividends
-    dividends.index = dividends.index.tz_localize(None)
-    missing_dividends = {
-        '2020-02-03': 0.164,
-        '2022-12-15': 0.237
-    }
-    for date, amount in missing_dividends.items():
-        dividends.loc[pd.Timestamp(date)] = amount
-    dividends.sort_index(inplace=True)
-    return dividends
+    return fetch_corrected_dividends(ticker)
 
 def fetch_price_history(ticker="PFF", start_date="2023-01-01"):
-    pff = yf.Ticker(ticker)
-    price_history = pff.history(start=start_date, end=pd.Timestamp.today(), auto_adjust=False)
+    price_history = fetch_history(ticker, start=start_date, end=pd.Timestamp.today(), auto_adjust=False)
     price_history = price_history[['Open', 'High', 'Low', 'Close']]
     price_history.reset_index(inplace=True)
     return price_history
 
 def fetch_tnx_data(period='2y'):
-    tnx = yf.download(['^TNX'], period=period, auto_adjust=True)
+    tnx = download(['^TNX'], period=period, auto_adjust=True)
     tnx.reset_index(inplace=True)
     return tnx
 
 def calculate_yield_from_date(dividends, prices):
-    results = []
     num_dividends_to_sum = 12
     prices['Date'] = prices['Date'].dt.tz_localize(None)
     dividends.index = dividends.index.tz_localize(None)
-    for date, closing_price in zip(prices['Date'], prices['Close']):
-        relevant_dividends = dividends[dividends.index < date].tail(num_dividends_to_sum)
-        if len(relevant_dividends) == num_dividends_to_sum:
-            last_12_dividends_sum = relevant_dividends.sum()
-            yield_percentage = (last_12_dividends_sum / closing_price) * 100
-            results.append({
-                "Date": date,
-                "Dividend Yield": yield_percentage
-            })
-    return results
+    return trailing_yield_series(dividends, prices['Date'], prices['Close'], num_dividends_to_sum)
 
 def find_extremums_and_compare(pff_yield, tnx):
-    pff_df = pd.DataFrame(pff_yield)
+    pff_df = pff_yield.to_frame()
     tnx_df = tnx[['Date', 'Close']].rename(columns={'Close': 'TNX Close'})
     merged_df = pd.merge(pff_df, tnx_df, on='Date', how='inner')
     merged_df['Spread'] = merged_df['Dividend Yield'] - merged_df['TNX Close']
@@ -119,3 +101,23 @@ if __name__ == "__main__":
     )
 
     fig.show()
+
+    # Rolling correlation, beta and residual volatility of the PFF yield against TNX
+    aligned_df = pd.merge(yield_results.to_frame(), tnx_data[['Date', 'Close']], on='Date', how='inner')
+    stats_df = rolling_stats_frame(aligned_df['Date'], aligned_df['Close'], aligned_df['Dividend Yield'], [ticker])
+    stats_table_df = latest_stats_table(stats_df, ticker)
+
+    stats_fig = go.Figure(data=[go.Table(
+        header=dict(values=list(stats_table_df.columns),
+                    fill_color='paleturquoise',
+                    align='left'),
+        cells=dict(values=[stats_table_df[column] for column in stats_table_df.columns],
+                   fill_color='lavender',
+                   align='left'))
+    ])
+
+    stats_fig.update_layout(
+        title='Rolling Correlation and Beta of PFF Yield vs TNX Close (Daily Changes)',
+    )
+
+    stats_fig.show()
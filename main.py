@@ -1,13 +1,13 @@
-import yfinance as yf
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from pff_fetch import fetch_dividends
+
 # Fetch historical dividend data for PFF using yfinance
 ticker = "PFF"
-pff = yf.Ticker(ticker)
 
 # Fetch historical dividends data
-dividends = pff.dividends
+dividends = fetch_dividends(ticker)
 
 # Check the first few rows of dividends data
 print(dividends.head())
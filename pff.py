@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+import argparse
+import json
+import os
+import socket
+import sys
+
+# Kept import-light on purpose: pandas / yfinance are only imported when no daemon
+# is running and the command has to be executed in this process.
+DEFAULT_SOCKET = os.path.join(os.path.expanduser("~"), ".cache", "pff", "daemon.sock")
+# Seconds to wait on the daemon before running the command here instead; long enough
+# for a cold fetch, short enough that a wedged daemon does not hang the CLI
+DAEMON_TIMEOUT = 30
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="pff", description="PFF yield and dividend tools")
+    parser.add_argument("--no-daemon", action="store_true", help="always run in this process")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    last_day = subparsers.add_parser("last-day", help="yield on the last close")
+    last_day.add_argument("--ticker", default="PFF")
+
+    last_n = subparsers.add_parser("last-n", help="yield for the last N bars")
+    last_n.add_argument("n", type=int, nargs="?", default=30)
+    last_n.add_argument("--ticker", default="PFF")
+
+    history = subparsers.add_parser("history", help="daily yield since a start date")
+    history.add_argument("--start-date", default="2023-01-01")
+    history.add_argument("--ticker", default="PFF")
+
+    dividends = subparsers.add_parser("dividends", help="dividends by year")
+    dividends.add_argument("--ticker", default="PFF")
+
+    overview = subparsers.add_parser("overview", help="yield vs TNX comparison table")
+    overview.add_argument("--start-date", default="2023-01-01")
+    overview.add_argument("--ticker", default="PFF")
+
+    serve = subparsers.add_parser("serve", help="run the resident daemon in the foreground")
+    serve.add_argument("--ttl", type=int, default=900, help="seconds to keep fetched data hot")
+
+    return parser
+
+
+def query_daemon(command, args):
+    # Returns the daemon's response, or None when no daemon is listening or it goes
+    # away or stops answering mid-request (reset, broken pipe, timeout, empty or
+    # truncated reply); socket.timeout is an OSError
+    path = os.environ.get("PFF_SOCKET", DEFAULT_SOCKET)
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(float(os.environ.get("PFF_DAEMON_TIMEOUT", DAEMON_TIMEOUT)))
+            sock.connect(path)
+            sock.sendall(json.dumps({"command": command, "args": args}).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as stream:
+                return json.loads(stream.readline())
+    except (OSError, ValueError):
+        return None
+
+
+def run_in_process(command, args):
+    from pff_commands import DataCache, run_command
+    return {"ok": True, "output": run_command(DataCache(), command, args)}
+
+
+def main(argv=None):
+    options = vars(build_parser().parse_args(argv))
+    command = options.pop("command")
+    no_daemon = options.pop("no_daemon")
+
+    if command == "serve":
+        import logging
+        from pff_daemon import serve
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+        return 0 if serve(ttl=options["ttl"]) else 1
+
+    response = None if no_daemon else query_daemon(command, options)
+    if response is None:
+        response = run_in_process(command, options)
+
+    if not response["ok"]:
+        print(response["error"], file=sys.stderr)
+        return 1
+    print(response["output"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,13 @@
-import yfinance as yf
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from pff_fetch import fetch_history
 
-def fetch_price_history(ticker="PFF"):
-    # Fetch historical price data for PFF using yfinance
-    pff = yf.Ticker(ticker)
-    price_history = pff.history(period="1y", interval="1d", auto_adjust = False)  # Last 20 days
+
+def fetch_price_history(ticker="PFF", period="1y", interval="1d"):
+    # Fetch historical price data for PFF using yfinance (last year of daily bars by default)
+    price_history = fetch_history(ticker, period=period, interval=interval, auto_adjust=False)
 
     # Keep only the necessary columns
     price_history = price_history[['Open', 'High', 'Low', 'Close']]
@@ -15,6 +15,9 @@ def fetch_price_history(ticker="PFF"):
     # Reset index to have Date as a column
     price_history.reset_index(inplace=True)
 
+    # Intraday bars come back indexed by "Datetime"
+    price_history.rename(columns={'Datetime': 'Date'}, inplace=True)
+
     return price_history
 
 
@@ -36,7 +39,7 @@ if __name__ == "__main__":
 
     # Update layout for interactivity
     fig.update_layout(
-        title=f'{ticker} Daily Candlestick Chart (Last 20 Days)',
+        title=f'{ticker} Daily Candlestick Chart (Last Year)',
         xaxis_title='Date',
         yaxis_title='Price',
         xaxis_rangeslider_visible=False,
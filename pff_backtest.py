@@ -0,0 +1,151 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from pff_fetch import fetch_corrected_dividends
+from PFF_TNX_Chart_Overview import (
+    fetch_price_history,
+    fetch_tnx_data,
+    calculate_yield_from_date,
+    find_extremums_and_compare,
+)
+
+TRADING_DAYS_PER_YEAR = 252
+SERIES_NAMES = ("returns", "yield", "spread")
+
+# Views onto the shared arrays, set once per worker process by _attach_shared_arrays
+_shared_arrays = {}
+_shared_handles = []
+
+
+def prepare_series(ticker="PFF", start_date="2023-01-01", tnx_period="2y"):
+    # Build the aligned price / yield / spread arrays the rules are evaluated on
+    dividends = fetch_corrected_dividends(ticker)
+    prices = fetch_price_history(ticker, start_date)
+    tnx_data = fetch_tnx_data(tnx_period)
+    yield_results = calculate_yield_from_date(dividends, prices)
+    merged_df, _ = find_extremums_and_compare(yield_results, tnx_data)
+    merged_df = pd.merge(merged_df, prices[['Date', 'Close']], on='Date', how='inner')
+
+    # Total return per bar: price change plus any dividend going ex on that bar
+    close = merged_df['Close'].to_numpy(dtype=np.float64)
+    paid = dividends.reindex(merged_df['Date']).fillna(0.0).to_numpy(dtype=np.float64)
+    returns = np.zeros_like(close)
+    returns[1:] = (close[1:] + paid[1:]) / close[:-1] - 1.0
+
+    return merged_df['Date'].to_numpy(), {
+        "returns": returns,
+        "yield": merged_df['Dividend Yield'].to_numpy(dtype=np.float64),
+        "spread": merged_df['Spread'].to_numpy(dtype=np.float64),
+    }
+
+
+def positions_for_rule(signal, entry_above, exit_below, max_holding):
+    # Vectorized hysteresis: enter when the signal is above entry_above, leave when it
+    # drops below exit_below, and never hold a single episode longer than max_holding bars.
+    n = len(signal)
+    index = np.arange(n)
+    events = np.where(signal > entry_above, 1, np.where(signal < exit_below, 0, -1))
+    last_event = np.maximum.accumulate(np.where(events >= 0, index, -1))
+    state = np.where(last_event >= 0, events[np.maximum(last_event, 0)], 0)
+
+    episode_start = np.empty(n, dtype=bool)
+    episode_start[0] = state[0] == 1
+    episode_start[1:] = (state[1:] == 1) & (state[:-1] == 0)
+    start_index = np.maximum.accumulate(np.where(episode_start, index, -1))
+    return (state == 1) & (index - start_index < max_holding)
+
+
+def evaluate_rule(returns, signal, entry_above, exit_below, max_holding):
+    position = positions_for_rule(signal, entry_above, exit_below, max_holding)
+
+    # A position decided at today's close earns tomorrow's return
+    strategy_returns = np.zeros_like(returns)
+    strategy_returns[1:] = np.where(position[:-1], returns[1:], 0.0)
+
+    equity = np.cumprod(1.0 + strategy_returns)
+    drawdown = equity / np.maximum.accumulate(equity) - 1.0
+    total_return = equity[-1] - 1.0
+    years = len(returns) / TRADING_DAYS_PER_YEAR
+    trades = int(np.count_nonzero(position[1:] & ~position[:-1]) + position[0])
+
+    return {
+        "Total Return %": total_return * 100,
+        "Annualized %": ((1.0 + total_return) ** (1.0 / years) - 1.0) * 100 if years > 0 else np.nan,
+        "Max Drawdown %": drawdown.min() * 100,
+        "Trades": trades,
+        "Exposure %": position.mean() * 100,
+    }
+
+
+def _attach_shared_arrays(specs):
+    # Worker initializer: map the parent's shared memory blocks instead of unpickling arrays
+    for name, (shm_name, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        _shared_handles.append(shm)
+        _shared_arrays[name] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _evaluate_chunk(signal_name, combos):
+    returns = _shared_arrays["returns"]
+    signal = _shared_arrays[signal_name]
+    rows = []
+    for entry_above, exit_below, max_holding in combos:
+        row = {"Entry Above": entry_above, "Exit Below": exit_below, "Max Holding": max_holding}
+        row.update(evaluate_rule(returns, signal, entry_above, exit_below, max_holding))
+        rows.append(row)
+    return rows
+
+
+def run_grid(series, entry_levels, exit_levels, holding_periods, signal_name="spread",
+             max_workers=None, chunk_size=256):
+    # Only keep combinations where the exit level does not sit above the entry level
+    combos = [(float(x), float(y), int(h))
+              for x, y, h in itertools.product(entry_levels, exit_levels, holding_periods) if y <= x]
+    chunks = [combos[i:i + chunk_size] for i in range(0, len(combos), chunk_size)]
+
+    blocks = []
+    specs = {}
+    try:
+        for name in SERIES_NAMES:
+            array = np.ascontiguousarray(series[name], dtype=np.float64)
+            shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+            blocks.append(shm)
+            specs[name] = (shm.name, array.shape, array.dtype.str)
+
+        max_workers = max_workers or os.cpu_count()
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_attach_shared_arrays,
+                                 initargs=(specs,)) as executor:
+            rows = []
+            for chunk_rows in executor.map(_evaluate_chunk, itertools.repeat(signal_name), chunks):
+                rows.extend(chunk_rows)
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    results = pd.DataFrame(rows)
+    if results.empty:
+        return results
+    return results.sort_values(["Total Return %", "Max Drawdown %"], ascending=[False, False]).reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    ticker = "PFF"
+    start_date = "2023-01-01"
+
+    dates, series = prepare_series(ticker, start_date)
+
+    # Spread levels in percentage points, holding periods in trading days
+    entry_levels = np.round(np.arange(1.0, 4.01, 0.05), 2)
+    exit_levels = np.round(np.arange(0.5, 3.51, 0.05), 2)
+    holding_periods = [5, 10, 21, 42, 63, 126, 252]
+
+    results = run_grid(series, entry_levels, exit_levels, holding_periods)
+    print(f"Evaluated {len(results)} rules on {len(dates)} bars")
+    print(results.head(20).to_string(index=False))
@@ -0,0 +1,91 @@
+import threading
+
+import pandas as pd
+import plotly.graph_objects as go
+import dash
+from dash import dcc, html, Input, Output
+
+from pff_adjusted_close_chart import fetch_price_history
+from pff_ohlc_pyramid import build_pyramid, MAX_CANDLES
+
+ticker = "PFF"
+
+# Every bar size is precomputed once per process, on the first request rather than at
+# import, so gunicorn workers (or a --preload master) do not each fetch at startup.
+# Callbacks only slice the arrays.
+_pyramid = None
+_pyramid_lock = threading.Lock()
+
+
+def get_pyramid():
+    global _pyramid
+    with _pyramid_lock:
+        if _pyramid is None:
+            _pyramid = build_pyramid(
+                daily=fetch_price_history(ticker, period="max", interval="1d"),
+                hourly=fetch_price_history(ticker, period="730d", interval="60m"),
+                minute=fetch_price_history(ticker, period="7d", interval="1m"),
+            )
+        return _pyramid
+
+
+def parse_range(relayout_data):
+    # Visible x-range from a relayoutData event, or the whole history on reset
+    if relayout_data:
+        if 'xaxis.range[0]' in relayout_data:
+            return pd.Timestamp(relayout_data['xaxis.range[0]']).value, pd.Timestamp(relayout_data['xaxis.range[1]']).value
+        if 'xaxis.range' in relayout_data:
+            start, end = relayout_data['xaxis.range']
+            return pd.Timestamp(start).value, pd.Timestamp(end).value
+    return get_pyramid().bounds()
+
+
+def build_figure(start_ns, end_ns):
+    # Send half a view of extra bars on each side so short pans do not show blank space
+    pad = (end_ns - start_ns) // 2
+    level, lo, hi = get_pyramid().select(start_ns - pad, end_ns + pad, max_candles=MAX_CANDLES * 2)
+    dates = level.dates[lo:hi].astype("datetime64[ns]")
+
+    fig = go.Figure(data=[go.Candlestick(
+        x=dates,
+        open=level.open[lo:hi],
+        high=level.high[lo:hi],
+        low=level.low[lo:hi],
+        close=level.close[lo:hi],
+        name=ticker
+    )])
+
+    fig.update_layout(
+        title=f'{ticker} Candlestick Chart ({level.label} bars)',
+        xaxis_title='Date',
+        yaxis_title='Price',
+        xaxis_rangeslider_visible=False,
+        xaxis_range=[pd.Timestamp(start_ns), pd.Timestamp(end_ns)],
+        hovermode='x unified',
+        uirevision=ticker
+    )
+    return fig
+
+
+def serve_layout():
+    return html.Div([
+        dcc.Graph(id='candlestick-chart', figure=build_figure(*get_pyramid().bounds()), style={'height': '90vh'})
+    ])
+
+
+app = dash.Dash(__name__)
+server = app.server
+app.layout = serve_layout
+
+
+@app.callback(Output('candlestick-chart', 'figure'), Input('candlestick-chart', 'relayoutData'),
+              prevent_initial_call=True)
+def update_candles(relayout_data):
+    if relayout_data and not any(key.startswith('xaxis.') for key in relayout_data):
+        return dash.no_update
+    start_ns, end_ns = parse_range(relayout_data)
+    return build_figure(start_ns, end_ns)
+
+
+if __name__ == '__main__':
+    app.run_server(debug=True)
@@ -0,0 +1,139 @@
+import threading
+import time
+
+import pandas as pd
+
+from PFF_TNX_Table_Overview import (
+    fetch_and_process_dividends,
+    fetch_price_history,
+    fetch_tnx_data,
+    calculate_yield_from_date,
+    find_extremums_and_compare,
+)
+from pff_yield_series import trailing_yield_series
+
+HISTORY_START = "2000-01-01"
+
+
+class DataCache:
+    # Keeps fetched dividends / prices / TNX closes in memory for ttl seconds.
+    # The CLI uses a fresh cache per run; the daemon keeps one alive between requests.
+    def __init__(self, ttl=900):
+        self.ttl = ttl
+        self.entries = {}
+        self.key_locks = {}
+        self.lock = threading.Lock()
+
+    def _fresh(self, key):
+        entry = self.entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            return entry
+        return None
+
+    def get(self, key, loader):
+        # The global lock only guards the dicts; a fetch holds just its own key's lock,
+        # so one slow load never blocks requests for other (or already cached) data
+        with self.lock:
+            entry = self._fresh(key)
+            if entry is not None:
+                return entry[1]
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Another request may have loaded it while this one waited
+            with self.lock:
+                entry = self._fresh(key)
+            if entry is not None:
+                return entry[1]
+            value = loader()
+            with self.lock:
+                self.entries[key] = (time.monotonic(), value)
+            return value
+
+    def dividends(self, ticker):
+        return self.get(("dividends", ticker), lambda: fetch_and_process_dividends(ticker))
+
+    def prices(self, ticker):
+        def load():
+            prices = fetch_price_history(ticker, HISTORY_START)
+            prices['Date'] = prices['Date'].dt.tz_localize(None)
+            return prices
+        return self.get(("prices", ticker), load)
+
+    def tnx(self, period="2y"):
+        return self.get(("tnx", period), lambda: fetch_tnx_data(period))
+
+
+def last_day(cache, ticker="PFF"):
+    dividends = cache.dividends(ticker)
+    prices = cache.prices(ticker)
+    last_closing_price = prices['Close'].iloc[-1]
+    last_12_dividends_sum = dividends.iloc[-12:].sum()
+    yield_percentage = (last_12_dividends_sum / last_closing_price) * 100
+    return "\n".join([
+        f"Last Closing Price: ${last_closing_price:.2f}",
+        f"Sum of Last 12 Dividends: ${last_12_dividends_sum:.2f}",
+        f"Dividend Yield: {yield_percentage:.2f}%",
+    ])
+
+
+def last_n(cache, ticker="PFF", n=30):
+    dividends = cache.dividends(ticker)
+    last_bars = cache.prices(ticker).iloc[::-1].head(n)
+    results = trailing_yield_series(dividends, last_bars['Date'], last_bars['Close'], include_details=True)
+    lines = []
+    for result in results:
+        lines.append(f"Date: {result['Date']}")
+        lines.append(f"Last Closing Price: ${result['Closing Price']:.2f}")
+        lines.append(f"Sum of Last 12 Dividends: ${result['Sum of Last 12 Dividends']:.2f}")
+        lines.append(f"Dividend Yield: {result['Dividend Yield']:.2f}%")
+        lines.append("---")
+    return "\n".join(lines)
+
+
+def history(cache, ticker="PFF", start_date="2023-01-01"):
+    dividends = cache.dividends(ticker)
+    prices = cache.prices(ticker)
+    prices = prices[prices['Date'] >= pd.Timestamp(start_date)].copy()
+    yield_df = calculate_yield_from_date(dividends, prices).to_frame()
+    return yield_df.to_string(index=False, float_format=lambda value: f"{value:.2f}")
+
+
+def dividends_by_year(cache, ticker="PFF"):
+    dividends = cache.dividends(ticker)
+    dividends_yearly_df = dividends.resample('YE').sum().reset_index()
+    dividends_yearly_df['Year'] = dividends_yearly_df['Date'].dt.year
+    dividends_yearly_df.rename(columns={'Dividends': 'Total Amount'}, inplace=True)
+    dividends_yearly_df['# Dividends'] = dividends.resample('YE').count().values
+    dividends_yearly_df['% Chg Year-over-Year'] = dividends_yearly_df['Total Amount'].pct_change() * 100
+    dividends_yearly_df.fillna(0, inplace=True)
+    return dividends_yearly_df[['Year', 'Total Amount', '# Dividends', '% Chg Year-over-Year']].to_string(
+        index=False, float_format=lambda value: f"{value:.2f}")
+
+
+def overview(cache, ticker="PFF", start_date="2023-01-01"):
+    dividends = cache.dividends(ticker)
+    prices = cache.prices(ticker)
+    prices = prices[prices['Date'] >= pd.Timestamp(start_date)].copy()
+    yield_results = calculate_yield_from_date(dividends, prices)
+    comparison_results = find_extremums_and_compare(yield_results, cache.tnx())
+    table_df = pd.DataFrame({
+        "Metric": ["Current", "52 Wk Avg", "52 Wk High", "52 Wk Low"],
+        "PFF Yield": [comparison_results[key] for key in ("current_pff", "pff_52wk_avg", "pff_52wk_high", "pff_52wk_low")],
+        "TNX Close": [comparison_results[key] for key in ("current_tnx", "tnx_52wk_avg", "tnx_52wk_high", "tnx_52wk_low")],
+        "Spread": [comparison_results[key] for key in ("current_spread", "spread_52wk_avg", "spread_52wk_high", "spread_52wk_low")],
+    })
+    return table_df.to_string(index=False)
+
+
+COMMANDS = {
+    "last-day": last_day,
+    "last-n": last_n,
+    "history": history,
+    "dividends": dividends_by_year,
+    "overview": overview,
+}
+
+
+def run_command(cache, command, args):
+    return COMMANDS[command](cache, **args)
@@ -0,0 +1,73 @@
+import json
+import logging
+import os
+import socket
+import socketserver
+
+from pff_commands import DataCache, run_command
+
+logger = logging.getLogger("pff_daemon")
+
+DEFAULT_SOCKET = os.path.join(os.path.expanduser("~"), ".cache", "pff", "daemon.sock")
+
+
+def socket_path():
+    return os.environ.get("PFF_SOCKET", DEFAULT_SOCKET)
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    # One JSON request line in, one JSON response line out
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            output = run_command(self.server.cache, request["command"], request.get("args", {}))
+            response = {"ok": True, "output": output}
+        except Exception as exc:
+            logger.exception("Request failed")
+            response = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class DaemonServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, cache):
+        self.cache = cache
+        super().__init__(path, RequestHandler)
+
+
+def daemon_running(path):
+    # A socket file alone may be left over from a crash; only a listener counts
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(1)
+            sock.connect(path)
+        return True
+    except OSError:
+        return False
+
+
+def serve(path=None, ttl=900):
+    # Returns False without touching the socket when another daemon is already listening
+    path = path or socket_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        if daemon_running(path):
+            logger.error("A pff daemon is already listening on %s", path)
+            return False
+        os.unlink(path)
+
+    server = DaemonServer(path, DataCache(ttl=ttl))
+    logger.info("pff daemon listening on %s", path)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+    return True
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    serve()
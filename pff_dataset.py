@@ -0,0 +1,121 @@
+import os
+
+import pandas as pd
+
+# On-disk layout: <root>/<kind>/ticker=<TICKER>/year=<YYYY>.parquet
+# Every partition path can be built from (kind, ticker, year), so a date-range read
+# touches only the overlapping files no matter how many tickers the archive holds.
+DEFAULT_ROOT = "data"
+BARS = "bars"
+DIVIDENDS = "dividends"
+COMPRESSION = "zstd"
+
+
+def partition_path(kind, ticker, year, root=DEFAULT_ROOT):
+    return os.path.join(root, kind, f"ticker={ticker}", f"year={year}.parquet")
+
+
+def _naive_dates(dates):
+    dates = pd.to_datetime(dates)
+    if getattr(dates.dt, "tz", None) is not None:
+        dates = dates.dt.tz_localize(None)
+    return dates
+
+
+def _stored_years(kind, ticker, root):
+    # Only needed for open-ended reads; lists a single ticker directory
+    ticker_dir = os.path.join(root, kind, f"ticker={ticker}")
+    if not os.path.isdir(ticker_dir):
+        return []
+    years = []
+    for name in os.listdir(ticker_dir):
+        if name.startswith("year=") and name.endswith(".parquet"):
+            years.append(int(name[len("year="):-len(".parquet")]))
+    return sorted(years)
+
+
+def _write_partitions(df, kind, ticker, root):
+    # Merge with any rows already stored so repeated exports only add new dates
+    written = []
+    for year, part in df.groupby(df['Date'].dt.year):
+        path = partition_path(kind, ticker, int(year), root)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            part = pd.concat([pd.read_parquet(path), part])
+        part = part.drop_duplicates(subset='Date', keep='last').sort_values('Date')
+        part.to_parquet(path, index=False, compression=COMPRESSION)
+        written.append(path)
+    return written
+
+
+def _read_partitions(kind, ticker, start_date, end_date, root):
+    start = pd.Timestamp(start_date) if start_date is not None else None
+    end = pd.Timestamp(end_date) if end_date is not None else None
+
+    if start is not None and end is not None:
+        years = range(start.year, end.year + 1)
+    else:
+        years = _stored_years(kind, ticker, root)
+        if start is not None:
+            years = [year for year in years if year >= start.year]
+        if end is not None:
+            years = [year for year in years if year <= end.year]
+
+    frames = []
+    for year in years:
+        path = partition_path(kind, ticker, year, root)
+        if os.path.exists(path):
+            frames.append(pd.read_parquet(path))
+    if not frames:
+        return None
+
+    df = pd.concat(frames, ignore_index=True)
+    if start is not None:
+        df = df[df['Date'] >= start]
+    if end is not None:
+        df = df[df['Date'] <= end]
+    return df.reset_index(drop=True)
+
+
+def write_bars(price_history, ticker="PFF", root=DEFAULT_ROOT):
+    # price_history is the DataFrame returned by fetch_price_history (Date column + OHLC)
+    df = price_history.copy()
+    df['Date'] = _naive_dates(df['Date'])
+    return _write_partitions(df, BARS, ticker, root)
+
+
+def write_dividends(dividends, ticker="PFF", root=DEFAULT_ROOT):
+    # dividends is the Series returned by fetch_and_process_dividends (indexed by date)
+    df = dividends.rename('Dividends').rename_axis('Date').reset_index()
+    df['Date'] = _naive_dates(df['Date'])
+    return _write_partitions(df, DIVIDENDS, ticker, root)
+
+
+def read_bars(ticker="PFF", start_date=None, end_date=None, root=DEFAULT_ROOT):
+    df = _read_partitions(BARS, ticker, start_date, end_date, root)
+    if df is None:
+        return pd.DataFrame(columns=['Date', 'Open', 'High', 'Low', 'Close'])
+    return df
+
+
+def read_dividends(ticker="PFF", start_date=None, end_date=None, root=DEFAULT_ROOT):
+    df = _read_partitions(DIVIDENDS, ticker, start_date, end_date, root)
+    if df is None:
+        return pd.Series(dtype=float, name='Dividends', index=pd.DatetimeIndex([], name='Date'))
+    return df.set_index('Date')['Dividends']
+
+
+def import_csv_archive(root=DEFAULT_ROOT, ticker="PFF"):
+    # One-off migration of the CSV dumps in the repository into the partitioned layout
+    prices = pd.read_csv('PFF_Price_History.csv')
+    prices['Date'] = pd.to_datetime(prices['Date'], utc=True).dt.tz_convert('America/New_York')
+    write_bars(prices, ticker, root)
+
+    dividends = pd.read_csv('PFF_Dividends_All.csv', parse_dates=['Date']).set_index('Date')['Dividends']
+    write_dividends(dividends, ticker, root)
+
+
+if __name__ == "__main__":
+    import_csv_archive()
+    print(read_bars("PFF", start_date="2023-01-01").tail())
+    print(read_dividends("PFF", start_date="2023-01-01").tail())
@@ -1,25 +1,10 @@
-import yfinance as yf
-import pandas as pd
+from pff_dataset import write_dividends
+from pff_fetch import fetch_corrected_dividends
 
 def fetch_and_process_dividends(ticker="PFF"):
-    # Fetch historical dividend data for PFF using yfinance
-    pff = yf.Ticker(ticker)
-    dividends = pff.dividends
-
-    # Ensure the dividends index is timezone-naive
-    dividends.index = dividends.index.tz_localize(None)
-
-    # Manually add missing dividends
-    missing_dividends = {
-        '2020-02-03': 0.164,
-        '2022-12-15': 0.237
-    }
-
-    for date, amount in missing_dividends.items():
-        dividends.loc[pd.Timestamp(date)] = amount
-
-    # Sort the dividends after adding new entries
-    dividends.sort_index(inplace=True)
+    # Fetch historical dividend data with the known missing payments added back
+    # (pff_fetch.DIVIDEND_CORRECTIONS) and a timezone-naive index
+    dividends = fetch_corrected_dividends(ticker)
 
     # Calculate yearly dividend data
     dividends_yearly = dividends.resample('YE').sum()
@@ -46,3 +31,5 @@ if __name__ == "__main__":
     # Save the processed data to CSV files
     dividends.to_csv('PFF_Dividends_All.csv')
     dividends_yearly_df.to_csv('PFF_Dividends_Yearly.csv')
+    # Also store the dividends in the partitioned dataset for date-range reads
+    write_dividends(dividends, "PFF")
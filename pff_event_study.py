@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+from pff_fetch import fetch_corrected_dividends
+from PFF_TNX_Table_Overview import fetch_price_history
+
+
+class EventWindows:
+    # Abnormal returns around every ex-date of every ticker, one row per event
+    __slots__ = ("tickers", "dates", "amounts", "offsets", "abnormal", "drop_ratio")
+
+    def __init__(self, tickers, dates, amounts, offsets, abnormal, drop_ratio):
+        self.tickers = tickers
+        self.dates = dates
+        self.amounts = amounts
+        self.offsets = offsets
+        self.abnormal = abnormal
+        self.drop_ratio = drop_ratio
+
+
+def event_windows(prices_by_ticker, dividends_by_ticker, window=5, estimation=60):
+    # prices_by_ticker: {ticker: (dates, unadjusted closes)}, dividends_by_ticker: {ticker: Series}.
+    # All tickers are laid end to end in one flat array so every window of every event is
+    # gathered with a single fancy-index; windows never cross into a neighbouring ticker.
+    tickers = list(prices_by_ticker)
+    closes = [np.asarray(prices_by_ticker[ticker][1], dtype=np.float64) for ticker in tickers]
+    lengths = np.array([len(close) for close in closes])
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    flat_close = np.concatenate(closes)
+
+    returns = np.full(len(flat_close), np.nan)
+    returns[1:] = flat_close[1:] / flat_close[:-1] - 1.0
+    returns[starts] = np.nan
+
+    # Event position: first trading day on or after each ex-date, offset into the flat array
+    event_rows, event_segments, event_tickers, event_dates, event_amounts = [], [], [], [], []
+    for k, ticker in enumerate(tickers):
+        dates = np.asarray(prices_by_ticker[ticker][0], dtype="datetime64[ns]")
+        dividends = dividends_by_ticker[ticker]
+        ex_dates = dividends.index.values.astype("datetime64[ns]")
+        rows = np.searchsorted(dates, ex_dates, side="left")
+        inside = (ex_dates >= dates[0]) & (rows < len(dates))
+        event_rows.append(rows[inside] + starts[k])
+        event_segments.append(np.full(inside.sum(), k))
+        event_tickers.extend([ticker] * int(inside.sum()))
+        event_dates.append(ex_dates[inside])
+        event_amounts.append(dividends.to_numpy(dtype=np.float64)[inside])
+
+    rows = np.concatenate(event_rows)
+    segments = np.concatenate(event_segments)
+    seg_start = starts[segments][:, None]
+    seg_end = (starts + lengths)[segments][:, None]
+
+    offsets = np.arange(-window, window + 1)
+    index = rows[:, None] + offsets
+    valid = (index > seg_start) & (index < seg_end)
+    window_returns = np.where(valid, returns[np.clip(index, 0, len(returns) - 1)], np.nan)
+
+    # Expected return: mean daily return over the estimation period ending before the window
+    cumulative = np.concatenate(([0.0], np.cumsum(np.nan_to_num(returns))))
+    counts = np.concatenate(([0], np.cumsum(~np.isnan(returns))))
+    est_end = np.clip(rows - window, seg_start[:, 0], seg_end[:, 0])
+    est_start = np.clip(est_end - estimation, seg_start[:, 0], seg_end[:, 0])
+    n_est = counts[est_end] - counts[est_start]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected = (cumulative[est_end] - cumulative[est_start]) / n_est
+    expected = np.where(n_est > 0, expected, np.nan)
+    abnormal = window_returns - expected[:, None]
+
+    # Price drop on the ex-day relative to the dividend paid
+    ex_valid = (rows > seg_start[:, 0])
+    drop = np.where(ex_valid, flat_close[np.maximum(rows - 1, 0)] - flat_close[rows], np.nan)
+    amounts = np.concatenate(event_amounts)
+
+    return EventWindows(np.array(event_tickers), np.concatenate(event_dates), amounts, offsets,
+                        abnormal, drop / amounts)
+
+
+def summarize(events, by_ticker=False):
+    # Mean and dispersion of abnormal returns and cumulative abnormal returns per offset
+    groups = {"All": np.ones(len(events.tickers), dtype=bool)}
+    if by_ticker:
+        groups = {ticker: events.tickers == ticker for ticker in np.unique(events.tickers)}
+
+    frames = []
+    for label, mask in groups.items():
+        abnormal = events.abnormal[mask]
+        car = np.nancumsum(abnormal, axis=1)
+        car[np.isnan(abnormal)] = np.nan
+        count = np.count_nonzero(~np.isnan(abnormal), axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_ar = np.nanmean(abnormal, axis=0)
+            std_ar = np.nanstd(abnormal, axis=0, ddof=1)
+            frames.append(pd.DataFrame({
+                "Ticker": label,
+                "Offset": events.offsets,
+                "Events": count,
+                "Mean AR %": mean_ar * 100,
+                "Std AR %": std_ar * 100,
+                "t-stat": mean_ar / (std_ar / np.sqrt(count)),
+                "Mean CAR %": np.nanmean(car, axis=0) * 100,
+                "Std CAR %": np.nanstd(car, axis=0, ddof=1) * 100,
+            }))
+    return pd.concat(frames, ignore_index=True)
+
+
+if __name__ == "__main__":
+    tickers = ["PFF"]
+    start_date = "2007-01-01"
+    window = 5
+
+    prices_by_ticker = {}
+    dividends_by_ticker = {}
+    for ticker in tickers:
+        prices = fetch_price_history(ticker, start_date)
+        prices_by_ticker[ticker] = (prices['Date'].dt.tz_localize(None), prices['Close'])
+        dividends_by_ticker[ticker] = fetch_corrected_dividends(ticker)
+
+    events = event_windows(prices_by_ticker, dividends_by_ticker, window=window)
+    print(f"{len(events.tickers)} ex-dividend events")
+    print(f"Average ex-day price drop / dividend: {np.nanmean(events.drop_ratio):.2f}")
+    print(summarize(events, by_ticker=len(tickers) > 1).to_string(index=False, float_format=lambda value: f"{value:.3f}"))
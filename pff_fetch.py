@@ -0,0 +1,290 @@
+import re
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+# All provider access goes through one FetchScheduler per process:
+#   - a token bucket throttles upstream calls,
+#   - identical concurrent requests share one in-flight call (singleflight),
+#   - history requests for the same ticker arriving within a short window are merged
+#     into one wider date range and each caller gets its own slice back,
+#   - results are kept for a short TTL so repeated calls in one run hit memory.
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class _Call:
+    # One in-flight upstream call that any number of callers can wait on
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class _HistoryBatch(_Call):
+    def __init__(self, start, end, period=None):
+        super().__init__()
+        self.start = start
+        self.end = end
+        # A yfinance period string is sent as-is while nothing outside it has joined;
+        # the provider measures intraday limits (60m: 730 days, 1m: 7 days) from now,
+        # which a start date at local midnight would overshoot
+        self.period = period
+        self.open = True
+
+    def extend(self, start, end, period=None):
+        if period != self.period and not _covers(self.start, self.end, start, end):
+            self.period = None
+        self.start = None if self.start is None or start is None else min(self.start, start)
+        self.end = None if self.end is None or end is None else max(self.end, end)
+
+
+def period_to_start(period):
+    # Translate yfinance period strings ("5d", "1mo", "2y", "max") into a start date
+    if period is None or period == "max":
+        return None
+    if period == "ytd":
+        return pd.Timestamp.today().normalize().replace(month=1, day=1)
+    match = re.fullmatch(r"(\d+)(d|wk|mo|y)", period)
+    if match is None:
+        raise ValueError(f"Unsupported period: {period}")
+    count, unit = int(match.group(1)), match.group(2)
+    offset = {
+        "d": pd.DateOffset(days=count),
+        "wk": pd.DateOffset(weeks=count),
+        "mo": pd.DateOffset(months=count),
+        "y": pd.DateOffset(years=count),
+    }[unit]
+    return pd.Timestamp.today().normalize() - offset
+
+
+def _covers(start, end, wanted_start, wanted_end):
+    # None means "from the beginning" for starts and "up to now" for ends
+    starts_early = start is None or (wanted_start is not None and start <= wanted_start)
+    ends_late = end is None or (wanted_end is not None and end >= wanted_end)
+    return starts_early and ends_late
+
+
+def _slice(frame, start, end):
+    index = frame.index
+    mask = np.ones(len(index), dtype=bool)
+    if start is not None:
+        start = pd.Timestamp(start)
+        if index.tz is not None and start.tz is None:
+            start = start.tz_localize(index.tz)
+        mask &= index >= start
+    if end is not None:
+        end = pd.Timestamp(end)
+        if index.tz is not None and end.tz is None:
+            end = end.tz_localize(index.tz)
+        mask &= index < end
+    return frame[mask].copy()
+
+
+class FetchScheduler:
+    def __init__(self, rate=2.0, burst=5, coalesce_window=0.05, ttl=300):
+        self.bucket = TokenBucket(rate, burst)
+        self.coalesce_window = coalesce_window
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.inflight = {}
+        self.batches = {}
+        self.active = {}
+        self.cache = {}
+        self.tickers = {}
+
+    def ticker(self, symbol):
+        # One yf.Ticker per symbol, shared by dividend and price requests
+        with self.lock:
+            if symbol not in self.tickers:
+                self.tickers[symbol] = yf.Ticker(symbol)
+            return self.tickers[symbol]
+
+    def _upstream(self, fn):
+        self.bucket.acquire()
+        return fn()
+
+    def _fresh(self, key, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        entry = self.cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] < ttl:
+            return entry
+        return None
+
+    def _singleflight(self, key, fn, ttl=None):
+        with self.lock:
+            entry = self._fresh(key, ttl)
+            if entry is not None:
+                return entry[1]
+            call = self.inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self.inflight[key] = _Call()
+
+        if not leader:
+            return call.wait()
+        try:
+            call.result = self._upstream(fn)
+            with self.lock:
+                self.cache[key] = (time.monotonic(), call.result)
+        except Exception as exc:
+            call.error = exc
+        finally:
+            with self.lock:
+                del self.inflight[key]
+            call.done.set()
+        return call.wait()
+
+    def dividends(self, symbol):
+        return self._singleflight(("dividends", symbol), lambda: self.ticker(symbol).dividends).copy()
+
+    def download(self, tickers, ttl=None, **kwargs):
+        # ttl=0 still throttles and shares in-flight calls but never reuses an older result
+        key = ("download", tuple(tickers), tuple(sorted(kwargs.items())))
+        return self._singleflight(key, lambda: yf.download(list(tickers), **kwargs), ttl).copy()
+
+    def history(self, symbol, start=None, end=None, period=None, interval="1d", auto_adjust=True):
+        if start is not None or period == "max":
+            period = None
+        if start is None and period is not None:
+            start = period_to_start(period)
+        start = None if start is None else pd.Timestamp(start)
+        end = None if end is None else pd.Timestamp(end)
+        # "Up to today" (e.g. end=pd.Timestamp.today()) moves on every call; treating it
+        # as open-ended lets identical requests share the cache and in-flight batches
+        if end is not None and end >= pd.Timestamp.now(tz=end.tz).normalize():
+            end = None
+        if end is not None:
+            period = None
+        key = ("history", symbol, interval, auto_adjust)
+
+        with self.lock:
+            entry = self._fresh(key)
+            if entry is not None and _covers(entry[2], entry[3], start, end):
+                return _slice(entry[1], start, end)
+            # Join a batch that is still collecting requests, or one already in flight
+            # whose range covers this request; otherwise start a new batch
+            batch = self.batches.get(key)
+            if batch is not None and batch.open:
+                batch.extend(start, end, period)
+                leader = False
+            elif batch is not None and _covers(batch.start, batch.end, start, end):
+                leader = False
+            else:
+                batch = self.batches[key] = _HistoryBatch(start, end, period)
+                leader = True
+            self.active[key] = self.active.get(key, 0) + 1
+
+        try:
+            if leader:
+                self._lead_history_batch(key, symbol, batch, interval, auto_adjust)
+            return _slice(batch.wait(), start, end)
+        finally:
+            with self.lock:
+                self.active[key] -= 1
+                if not self.active[key]:
+                    del self.active[key]
+
+    def _lead_history_batch(self, key, symbol, batch, interval, auto_adjust):
+        # Give concurrent callers a moment to join, but only when another caller is
+        # already working on this key; a lone script call goes straight upstream
+        with self.lock:
+            contended = self.active.get(key, 0) > 1
+        if contended:
+            time.sleep(self.coalesce_window)
+        with self.lock:
+            batch.open = False
+        try:
+            batch.result = self._upstream(lambda: self._fetch_history(symbol, batch.start, batch.end, batch.period,
+                                                                      interval, auto_adjust))
+            with self.lock:
+                self.cache[key] = (time.monotonic(), batch.result, batch.start, batch.end)
+        except Exception as exc:
+            batch.error = exc
+        finally:
+            with self.lock:
+                if self.batches.get(key) is batch:
+                    del self.batches[key]
+            batch.done.set()
+
+    def _fetch_history(self, symbol, start, end, period, interval, auto_adjust):
+        if period is not None:
+            return self.ticker(symbol).history(period=period, interval=interval, auto_adjust=auto_adjust)
+        if start is None and end is None:
+            return self.ticker(symbol).history(period="max", interval=interval, auto_adjust=auto_adjust)
+        if start is None:
+            start = pd.Timestamp("1970-01-02")
+        return self.ticker(symbol).history(start=start, end=end, interval=interval, auto_adjust=auto_adjust)
+
+
+default_scheduler = FetchScheduler()
+
+
+def fetch_dividends(ticker):
+    return default_scheduler.dividends(ticker)
+
+
+# Payments missing from Yahoo's dividend history, by ticker. Every dividend loader
+# applies these through correct_dividends so other tickers never pick them up.
+DIVIDEND_CORRECTIONS = {
+    "PFF": {
+        '2020-02-03': 0.164,
+        '2022-12-15': 0.237
+    },
+}
+
+
+def correct_dividends(dividends, ticker, start=None):
+    # Add the known missing payments for this ticker (those on or after start, when
+    # given) to a tz-naive dividend series and return it sorted
+    for date, amount in DIVIDEND_CORRECTIONS.get(ticker, {}).items():
+        if start is None or pd.Timestamp(date) >= pd.Timestamp(start):
+            dividends.loc[pd.Timestamp(date)] = amount
+    return dividends.sort_index()
+
+
+def fetch_corrected_dividends(ticker, start=None):
+    # Provider dividends with a tz-naive index and the corrections applied. The
+    # scheduler's cached series is copied, never modified.
+    dividends = fetch_dividends(ticker).copy()
+    dividends.index = dividends.index.tz_localize(None)
+    if start is not None:
+        dividends = dividends[dividends.index >= pd.Timestamp(start)]
+    return correct_dividends(dividends, ticker, start)
+
+
+def fetch_history(ticker, start=None, end=None, period=None, interval="1d", auto_adjust=True):
+    return default_scheduler.history(ticker, start=start, end=end, period=period, interval=interval,
+                                     auto_adjust=auto_adjust)
+
+
+def download(tickers, ttl=None, **kwargs):
+    return default_scheduler.download(tickers, ttl=ttl, **kwargs)
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+from pff_dataset import read_bars, read_dividends
+from pff_fetch import correct_dividends, fetch_corrected_dividends, fetch_history
+
+NUM_DIVIDENDS_TO_SUM = 12
+PAYMENTS_PER_YEAR = 12
+# Calendar-day slack for exchange holidays in the price range and for late or
+# skipped payments in the dividend lookback
+HOLIDAY_PADDING_DAYS = 10
+PAYMENT_PADDING_DAYS = 45
+MAX_WIDENINGS = 4
+# Yields use actual (unadjusted) closes, the basis pff_price_history writes to the archive
+# and PFF_TNX_Table_Overview fetches, so both sources give the same numbers
+AUTO_ADJUST = False
+
+
+class FetchPlan:
+    # Smallest price range and dividend lookback for "yield on the last n bars":
+    # n trading bars are about n * 7 / 5 calendar days, and the trailing sum on the
+    # oldest of them needs num_dividends_to_sum payments before it
+    __slots__ = ("today", "n_bars", "num_dividends_to_sum", "price_days", "dividend_days")
+
+    def __init__(self, today, n_bars, num_dividends_to_sum, price_days, dividend_days):
+        self.today = today
+        self.n_bars = n_bars
+        self.num_dividends_to_sum = num_dividends_to_sum
+        self.price_days = price_days
+        self.dividend_days = dividend_days
+
+    @property
+    def price_start(self):
+        return self.today - pd.Timedelta(days=self.price_days)
+
+    @property
+    def dividend_start(self):
+        return self.price_start - pd.Timedelta(days=self.dividend_days)
+
+    def widen(self, factor=2):
+        return FetchPlan(self.today, self.n_bars, self.num_dividends_to_sum,
+                         self.price_days * factor, self.dividend_days * factor)
+
+    def is_current(self, prices):
+        # The newest bar is recent; widening the window cannot fix a stale source
+        return len(prices) > 0 and prices['Date'].iloc[-1] >= self.today - pd.Timedelta(days=HOLIDAY_PADDING_DAYS)
+
+    def satisfied_by(self, dividends, prices):
+        # Enough bars, and enough dividends before the oldest bar that will be used
+        if len(prices) < self.n_bars:
+            return False
+        oldest = prices['Date'].iloc[-self.n_bars]
+        return int(np.count_nonzero(dividends.index < oldest)) >= self.num_dividends_to_sum
+
+
+def plan_last_n_bars(n_bars, num_dividends_to_sum=NUM_DIVIDENDS_TO_SUM,
+                     payments_per_year=PAYMENTS_PER_YEAR, today=None):
+    today = pd.Timestamp.today().normalize() if today is None else pd.Timestamp(today).normalize()
+    price_days = int(np.ceil(n_bars * 7 / 5)) + HOLIDAY_PADDING_DAYS
+    dividend_days = int(np.ceil(num_dividends_to_sum * 365 / payments_per_year)) + PAYMENT_PADDING_DAYS
+    return FetchPlan(today, n_bars, num_dividends_to_sum, price_days, dividend_days)
+
+
+def _load_prices(ticker, plan, root):
+    if root is not None:
+        # Archive bars are unadjusted (AUTO_ADJUST) as written by pff_price_history
+        return read_bars(ticker, plan.price_start, plan.today, root=root)[['Date', 'Close']]
+    prices = fetch_history(ticker, start=plan.price_start, auto_adjust=AUTO_ADJUST)[['Close']].reset_index()
+    prices['Date'] = prices['Date'].dt.tz_localize(None)
+    return prices
+
+
+def _load_dividends(ticker, plan, root):
+    if root is not None:
+        dividends = read_dividends(ticker, plan.dividend_start, plan.today, root=root)
+        return correct_dividends(dividends, ticker, plan.dividend_start)
+    # The provider only serves the full dividend history; it is small and cached by
+    # the scheduler, so widening the lookback does not refetch it
+    return fetch_corrected_dividends(ticker, plan.dividend_start)
+
+
+def _fetch_planned(ticker, n_bars, num_dividends_to_sum, root):
+    # Widen the window while it comes up short (holiday runs, skipped payments);
+    # None when the source is stale or still short after MAX_WIDENINGS
+    plan = plan_last_n_bars(n_bars, num_dividends_to_sum)
+    for _ in range(MAX_WIDENINGS + 1):
+        prices = _load_prices(ticker, plan, root)
+        if not plan.is_current(prices):
+            return None
+        dividends = _load_dividends(ticker, plan, root)
+        if plan.satisfied_by(dividends, prices):
+            return dividends, prices.reset_index(drop=True)
+        plan = plan.widen()
+    return None
+
+
+def fetch_last_n_bars(ticker="PFF", n_bars=30, num_dividends_to_sum=NUM_DIVIDENDS_TO_SUM, root=None):
+    # Dividends and Date/Close bars covering the last n_bars and their trailing-dividend
+    # window, read from the local pff_dataset archive under root when given, otherwise
+    # from the provider. An archive that is stale or too short falls back to the provider.
+    result = None
+    if root is not None:
+        result = _fetch_planned(ticker, n_bars, num_dividends_to_sum, root)
+    if result is None:
+        result = _fetch_planned(ticker, n_bars, num_dividends_to_sum, None)
+    if result is None:
+        raise ValueError(f"Not enough current history for {ticker}: need {n_bars} recent bars "
+                         f"and {num_dividends_to_sum} dividends before them")
+    return result
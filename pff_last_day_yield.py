@@ -1,50 +1,12 @@
-import yfinance as yf
-import pandas as pd
-
-
-def fetch_and_process_dividends(ticker="PFF"):
-    # Fetch historical dividend data for PFF using yfinance
-    pff = yf.Ticker(ticker)
-    dividends = pff.dividends
-
-    # Ensure the dividends index is timezone-naive
-    dividends.index = dividends.index.tz_localize(None)
-
-    # Manually add missing dividends
-    missing_dividends = {
-        '2020-02-03': 0.164,
-        '2022-12-15': 0.237
-    }
-
-    for date, amount in missing_dividends.items():
-        dividends.loc[pd.Timestamp(date)] = amount
-
-    # Sort the dividends after adding new entries
-    dividends.sort_index(inplace=True)
-
-    return dividends
-
-
-def fetch_price_history(ticker="PFF"):
-    # Fetch historical price data for PFF using yfinance
-    pff = yf.Ticker(ticker)
-    price_history = pff.history(period="max")
-
-    # Keep only the 'Close' prices
-    price_history = price_history[['Close']]
-
-    # Reset index to have Date as a column
-    price_history.reset_index(inplace=True)
-
-    return price_history
+from pff_fetch_plan import fetch_last_n_bars
+from pff_yield_series import CLOSING_PRICE, DATE, yield_definitions
 
 
 if __name__ == "__main__":
     ticker = "PFF"
 
     # Fetch and process data
-    dividends = fetch_and_process_dividends(ticker)
-    prices = fetch_price_history(ticker)
+    dividends, prices = fetch_last_n_bars(ticker, n_bars=1)
 
     # Get the last closing price
     last_closing_price = prices['Close'].iloc[-1]
@@ -59,3 +21,8 @@ if __name__ == "__main__":
     print(f"Last Closing Price: ${last_closing_price:.2f}")
     print(f"Sum of Last 12 Dividends: ${last_12_dividends_sum:.2f}")
     print(f"Dividend Yield: {yield_percentage:.2f}%")
+
+    # The same close under each trailing-yield definition
+    definitions = yield_definitions(dividends, prices['Date'].iloc[-1:], [last_closing_price])
+    for label, value in definitions.drop(columns=[DATE, CLOSING_PRICE]).iloc[0].items():
+        print(f"{label}: {value:.2f}")
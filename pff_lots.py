@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+from pff_yield_series import DividendIndex
+from PFF_TNX_Table_Overview import fetch_and_process_dividends, fetch_price_history
+
+
+def read_lots(path):
+    # CSV with one row per tax lot: Purchase Date,Shares[,Cost Basis] (cost per share)
+    lots = pd.read_csv(path, parse_dates=['Purchase Date'])
+    lots['Shares'] = lots['Shares'].astype(float)
+    if 'Cost Basis' not in lots:
+        lots['Cost Basis'] = np.nan
+    return lots[['Purchase Date', 'Shares', 'Cost Basis']]
+
+
+def fill_cost_basis(lots, prices):
+    # Lots without a cost basis use the close on (or just before) their purchase date.
+    # A purchase before the first price in `prices` has no such close and stays NaN.
+    missing = lots['Cost Basis'].isna().to_numpy()
+    if not missing.any():
+        return lots
+    price_dates = prices['Date'].dt.tz_localize(None).to_numpy(dtype="datetime64[ns]")
+    purchase = lots['Purchase Date'].to_numpy(dtype="datetime64[ns]")[missing]
+    rows = np.searchsorted(price_dates, purchase, side="right") - 1
+    closes = prices['Close'].to_numpy(dtype=np.float64)
+    lots = lots.copy()
+    lots.loc[missing, 'Cost Basis'] = np.where(rows >= 0, closes[np.maximum(rows, 0)], np.nan)
+    return lots
+
+
+def lot_report(index, lots, as_of=None):
+    # Current yield-on-cost and dividends received for every lot, computed as arrays
+    as_of = pd.Timestamp.today().normalize() if as_of is None else pd.Timestamp(as_of)
+    purchase = lots['Purchase Date'].to_numpy(dtype="datetime64[ns]")
+    shares = lots['Shares'].to_numpy(dtype=np.float64)
+    cost = lots['Cost Basis'].to_numpy(dtype=np.float64)
+
+    per_share = index.between(purchase, np.full(len(lots), np.datetime64(as_of, "ns")))
+    trailing = index.trailing_sum(np.datetime64(as_of, "ns"))
+
+    report = lots.copy()
+    report['Dividends/Share'] = per_share
+    report['Dividends Received'] = per_share * shares
+    report['Yield on Cost %'] = trailing / cost * 100
+    report['Cash Returned %'] = per_share / cost * 100
+    return report
+
+
+def yield_on_cost_history(index, lots, dates):
+    # Historical yield-on-cost and cumulative dividends per share, shape (dates, lots).
+    # Dates before a lot's purchase are NaN.
+    dates = np.asarray(dates, dtype="datetime64[ns]")
+    purchase = lots['Purchase Date'].to_numpy(dtype="datetime64[ns]")
+    cost = lots['Cost Basis'].to_numpy(dtype=np.float64)
+
+    held = dates[:, None] >= purchase[None, :]
+    trailing = index.trailing_sum(dates)
+    yield_on_cost = np.where(held, trailing[:, None] / cost[None, :] * 100, np.nan)
+
+    received = index.prefix[index.paid_through(dates)][:, None] - index.prefix[index.paid_through(purchase)][None, :]
+    received = np.where(held, received, np.nan)
+    return yield_on_cost, received
+
+
+if __name__ == "__main__":
+    import sys
+
+    ticker = "PFF"
+    lots = read_lots(sys.argv[1] if len(sys.argv) > 1 else "lots.csv")
+    dividends = fetch_and_process_dividends(ticker)
+    # Start a week early so a purchase on a weekend or holiday still finds a prior close
+    prices = fetch_price_history(ticker, (lots['Purchase Date'].min() - pd.Timedelta(days=7)).strftime("%Y-%m-%d"))
+    lots = fill_cost_basis(lots, prices)
+    unpriced = lots['Cost Basis'].isna()
+    if unpriced.any():
+        print(f"No cost basis for {int(unpriced.sum())} lot(s) bought before the available price history")
+
+    index = DividendIndex(dividends)
+    report = lot_report(index, lots)
+    print(report.to_string(index=False, float_format=lambda value: f"{value:.2f}"))
+    print(f"Total Dividends Received: ${report['Dividends Received'].sum():.2f}")
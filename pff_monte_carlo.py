@@ -0,0 +1,165 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from PFF_TNX_Table_Overview import (
+    fetch_and_process_dividends,
+    fetch_price_history,
+    fetch_tnx_data,
+)
+
+NUM_DIVIDENDS_TO_SUM = 12
+TRADING_DAYS_PER_PAYMENT = 21
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+class ScenarioInputs:
+    # Everything a simulation chunk needs, kept as plain arrays so it pickles cheaply
+    __slots__ = ("last_close", "last_tnx", "daily_log_returns", "tnx_changes",
+                 "last_dividends", "dividend_log_changes", "days_to_next_payment", "last_date")
+
+    def __init__(self, last_close, last_tnx, daily_log_returns, tnx_changes,
+                 last_dividends, dividend_log_changes, days_to_next_payment, last_date):
+        self.last_close = last_close
+        self.last_tnx = last_tnx
+        self.daily_log_returns = daily_log_returns
+        self.tnx_changes = tnx_changes
+        self.last_dividends = last_dividends
+        self.dividend_log_changes = dividend_log_changes
+        self.days_to_next_payment = days_to_next_payment
+        self.last_date = last_date
+
+
+def prepare_inputs(ticker="PFF", start_date="2013-01-01", tnx_period="10y"):
+    # Seed the scenarios from the same dividend / price / TNX series the charts use
+    dividends = fetch_and_process_dividends(ticker)
+    prices = fetch_price_history(ticker, start_date)
+    prices['Date'] = prices['Date'].dt.tz_localize(None)
+    tnx = fetch_tnx_data(tnx_period)[['Date', 'Close']].rename(columns={'Close': 'TNX Close'})
+    merged_df = pd.merge(prices[['Date', 'Close']], tnx, on='Date', how='inner')
+
+    # Price returns and TNX changes come from the same days, so resampling whole days
+    # keeps their historical co-movement
+    close = merged_df['Close'].to_numpy(dtype=np.float64)
+    tnx_close = merged_df['TNX Close'].to_numpy(dtype=np.float64)
+    amounts = dividends.to_numpy(dtype=np.float64)
+    trading_days_since_payment = int(np.count_nonzero(prices['Date'] > dividends.index[-1]))
+
+    return ScenarioInputs(
+        last_close=close[-1],
+        last_tnx=tnx_close[-1],
+        daily_log_returns=np.diff(np.log(close)),
+        tnx_changes=np.diff(tnx_close),
+        last_dividends=amounts[-NUM_DIVIDENDS_TO_SUM:],
+        dividend_log_changes=np.diff(np.log(amounts)),
+        days_to_next_payment=max(1, TRADING_DAYS_PER_PAYMENT - trading_days_since_payment),
+        last_date=prices['Date'].iloc[-1],
+    )
+
+
+def simulate_chunk(inputs, n_paths, horizon, report_days, seed, cut_probability=0.0, cut_size=0.0):
+    # Simulate n_paths price / dividend / TNX paths at once and return yield and spread
+    # on the report days, shape (n_paths, len(report_days)).
+    rng = np.random.default_rng(seed)
+
+    days = rng.integers(0, len(inputs.daily_log_returns), size=(n_paths, horizon))
+    prices = inputs.last_close * np.exp(np.cumsum(inputs.daily_log_returns[days], axis=1))
+    tnx = inputs.last_tnx + np.cumsum(inputs.tnx_changes[days], axis=1)
+    del days
+
+    # Future monthly payments: bootstrapped month-over-month changes plus optional cuts
+    n_payments = (horizon - inputs.days_to_next_payment) // TRADING_DAYS_PER_PAYMENT + 1
+    changes = inputs.dividend_log_changes[rng.integers(0, len(inputs.dividend_log_changes),
+                                                       size=(n_paths, n_payments))]
+    if cut_probability > 0:
+        changes = changes + np.where(rng.random((n_paths, n_payments)) < cut_probability, np.log1p(-cut_size), 0.0)
+    future = inputs.last_dividends[-1] * np.exp(np.cumsum(changes, axis=1))
+
+    # Prefix sums over [last 12 paid, future payments]; the trailing sum after k new
+    # payments is a difference of two prefix-sum columns
+    payments = np.concatenate((np.broadcast_to(inputs.last_dividends, (n_paths, NUM_DIVIDENDS_TO_SUM)), future), axis=1)
+    prefix = np.concatenate((np.zeros((n_paths, 1)), np.cumsum(payments, axis=1)), axis=1)
+    report_days = np.asarray(report_days)
+    paid = np.clip((report_days + 1 - inputs.days_to_next_payment) // TRADING_DAYS_PER_PAYMENT + 1, 0, n_payments)
+    trailing = prefix[:, NUM_DIVIDENDS_TO_SUM + paid] - prefix[:, paid]
+
+    yields = trailing / prices[:, report_days] * 100
+    spreads = yields - tnx[:, report_days]
+    return yields.astype(np.float32), spreads.astype(np.float32)
+
+
+def _simulate_chunk_args(args):
+    return simulate_chunk(*args)
+
+
+def run_scenarios(inputs, n_paths=50000, horizon=252, chunk_size=5000, report_every=5,
+                  cut_probability=0.0, cut_size=0.0, seed=0, processes=None):
+    # Chunks cap peak memory at about chunk_size * horizon floats per array; each chunk has
+    # its own seed so results do not depend on how many processes run them.
+    report_days = np.unique(np.append(np.arange(report_every - 1, horizon, report_every), horizon - 1))
+    sizes = [min(chunk_size, n_paths - start) for start in range(0, n_paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(inputs, size, horizon, report_days, chunk_seed, cut_probability, cut_size)
+             for size, chunk_seed in zip(sizes, seeds)]
+
+    if processes is not None and processes != 1:
+        with ProcessPoolExecutor(max_workers=processes or os.cpu_count()) as executor:
+            results = list(executor.map(_simulate_chunk_args, tasks))
+    else:
+        results = [_simulate_chunk_args(task) for task in tasks]
+
+    yields = np.concatenate([result[0] for result in results])
+    spreads = np.concatenate([result[1] for result in results])
+    dates = pd.bdate_range(inputs.last_date + pd.offsets.BDay(1), periods=horizon)[report_days]
+    return percentile_fan(dates, yields, spreads)
+
+
+def percentile_fan(dates, yields, spreads, percentiles=PERCENTILES):
+    columns = {"Date": dates}
+    yield_bands = np.percentile(yields, percentiles, axis=0)
+    spread_bands = np.percentile(spreads, percentiles, axis=0)
+    for i, pct in enumerate(percentiles):
+        columns[f"Yield P{pct}"] = yield_bands[i]
+    for i, pct in enumerate(percentiles):
+        columns[f"Spread P{pct}"] = spread_bands[i]
+    return pd.DataFrame(columns)
+
+
+def fan_traces(fan, series="Yield", name="PFF Yield", percentiles=PERCENTILES):
+    # Shaded bands (outer to inner) plus the median line, ready to add to the existing figures
+    import plotly.graph_objects as go
+    traces = []
+    for low, high in zip(percentiles[:len(percentiles) // 2], percentiles[::-1][:len(percentiles) // 2]):
+        traces.append(go.Scatter(x=fan['Date'], y=fan[f"{series} P{high}"], mode='lines',
+                                 line={'width': 0}, showlegend=False, hoverinfo='skip'))
+        traces.append(go.Scatter(x=fan['Date'], y=fan[f"{series} P{low}"], mode='lines',
+                                 line={'width': 0}, fill='tonexty', fillcolor='rgba(31, 119, 180, 0.2)',
+                                 name=f"{name} P{low}-P{high}"))
+    median = percentiles[len(percentiles) // 2]
+    traces.append(go.Scatter(x=fan['Date'], y=fan[f"{series} P{median}"], mode='lines',
+                             line={'dash': 'dash'}, name=f"{name} Median"))
+    return traces
+
+
+if __name__ == "__main__":
+    import plotly.graph_objects as go
+
+    ticker = "PFF"
+    inputs = prepare_inputs(ticker)
+    fan = run_scenarios(inputs, n_paths=50000, horizon=252, cut_probability=0.02, cut_size=0.10)
+    print(fan.iloc[[0, len(fan) // 4, len(fan) // 2, -1]].to_string(index=False, float_format=lambda value: f"{value:.2f}"))
+
+    fig = go.Figure()
+    for trace in fan_traces(fan, "Yield", f"{ticker} Yield") + fan_traces(fan, "Spread", "Spread"):
+        fig.add_trace(trace)
+
+    fig.update_layout(
+        title=f'{ticker} Yield and Spread vs TNX: Simulated Next 12 Months',
+        xaxis_title='Date',
+        yaxis_title='Value',
+        hovermode='x unified'
+    )
+
+    fig.show()
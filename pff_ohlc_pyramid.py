@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+# Maximum number of candles sent to the browser for one view
+MAX_CANDLES = 400
+
+NS_PER_MINUTE = 60 * 10**9
+NS_PER_HOUR = 60 * NS_PER_MINUTE
+NS_PER_DAY = 24 * NS_PER_HOUR
+NS_PER_WEEK = 7 * NS_PER_DAY
+# 1970-01-01 was a Thursday; shifting by 3 days makes week buckets start on Monday
+WEEK_OFFSET = 3 * NS_PER_DAY
+
+
+class OHLCLevel:
+    __slots__ = ("label", "bar_ns", "dates", "open", "high", "low", "close")
+
+    def __init__(self, label, bar_ns, dates, open_, high, low, close):
+        self.label = label
+        self.bar_ns = bar_ns
+        self.dates = dates
+        self.open = open_
+        self.high = high
+        self.low = low
+        self.close = close
+
+    def __len__(self):
+        return len(self.dates)
+
+    def window(self, start_ns, end_ns):
+        # Bars overlapping [start_ns, end_ns] via binary search on the sorted dates
+        lo = max(np.searchsorted(self.dates, start_ns, side="right") - 1, 0)
+        hi = np.searchsorted(self.dates, end_ns, side="right")
+        return lo, hi
+
+
+def level_from_frame(label, bar_ns, frame):
+    # frame is a price history DataFrame with a Date column and OHLC columns
+    dates = pd.to_datetime(frame['Date'])
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    return OHLCLevel(
+        label, bar_ns,
+        dates.to_numpy(dtype="datetime64[ns]").view(np.int64),
+        frame['Open'].to_numpy(dtype=np.float64),
+        frame['High'].to_numpy(dtype=np.float64),
+        frame['Low'].to_numpy(dtype=np.float64),
+        frame['Close'].to_numpy(dtype=np.float64),
+    )
+
+
+def aggregate(level, label, keys, bar_ns):
+    # Group consecutive bars sharing a key and reduce each group in one vectorized pass
+    if len(level) == 0:
+        return OHLCLevel(label, bar_ns, level.dates, level.open, level.high, level.low, level.close)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1))
+    ends = np.concatenate((starts[1:], [len(keys)])) - 1
+    return OHLCLevel(
+        label, bar_ns,
+        level.dates[starts],
+        level.open[starts],
+        np.maximum.reduceat(level.high, starts),
+        np.minimum.reduceat(level.low, starts),
+        level.close[ends],
+    )
+
+
+def weekly_keys(dates_ns):
+    return (dates_ns + WEEK_OFFSET) // NS_PER_WEEK
+
+
+def monthly_keys(dates_ns):
+    months = dates_ns.astype("datetime64[ns]").astype("datetime64[M]")
+    return months.astype(np.int64)
+
+
+class OHLCPyramid:
+    # Bar sizes from finest to coarsest. Intraday levels usually cover only the recent
+    # past (the provider limits minute/hour history), so a level is only picked when it
+    # reaches back to the start of the visible range.
+    def __init__(self, levels):
+        self.levels = [level for level in levels if len(level)]
+
+    def select(self, start_ns, end_ns, max_candles=MAX_CANDLES):
+        # Finest level that covers the range and stays within the candle budget
+        for level in self.levels:
+            if level.dates[0] > start_ns and level is not self.levels[-1]:
+                continue
+            lo, hi = level.window(start_ns, end_ns)
+            if hi - lo <= max_candles:
+                return level, lo, hi
+        level = self.levels[-1]
+        lo, hi = level.window(start_ns, end_ns)
+        return level, lo, hi
+
+    def bounds(self):
+        return min(level.dates[0] for level in self.levels), max(level.dates[-1] for level in self.levels)
+
+
+def build_pyramid(daily, hourly=None, minute=None):
+    day = level_from_frame("1D", NS_PER_DAY, daily)
+    levels = []
+    if minute is not None and len(minute):
+        levels.append(level_from_frame("1min", NS_PER_MINUTE, minute))
+    if hourly is not None and len(hourly):
+        levels.append(level_from_frame("1h", NS_PER_HOUR, hourly))
+    levels.append(day)
+    levels.append(aggregate(day, "1W", weekly_keys(day.dates), NS_PER_WEEK))
+    levels.append(aggregate(day, "1M", monthly_keys(day.dates), 30 * NS_PER_DAY))
+    return OHLCPyramid(levels)
@@ -0,0 +1,63 @@
+import base64
+
+import numpy as np
+
+# Plotly.js (2.28+) accepts data arrays as {"dtype": ..., "bdata": <base64>} typed arrays.
+# Sending series that way instead of one JSON number/ISO string per point shrinks the
+# figure and dcc.Store payloads several times without changing what is drawn.
+TYPED_DTYPES = {"i1", "u1", "i2", "u2", "i4", "u4", "f4", "f8"}
+
+
+def encode_array(values, float32=False):
+    values = np.asarray(values)
+    if values.dtype.kind == "M":
+        values = epoch_ms(values)
+    elif values.dtype.kind == "f" and float32:
+        values = values.astype(np.float32)
+    if values.dtype.str[1:] not in TYPED_DTYPES:
+        values = values.astype(np.float64)
+    # Typed arrays are always little-endian
+    values = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder("<"))
+    return {"dtype": values.dtype.str[1:], "bdata": base64.b64encode(values.tobytes()).decode("ascii")}
+
+
+def epoch_ms(dates):
+    # Milliseconds since the epoch as float64 (exact for dates); a plotly date axis
+    # renders these the same as ISO strings
+    dates = np.asarray(dates, dtype="datetime64[ms]")
+    return dates.astype(np.int64).astype(np.float64)
+
+
+def encode_dates(dates):
+    # Typed-array date axis; encode once and pass to every trace that shares it
+    return encode_array(epoch_ms(dates))
+
+
+def scatter_trace(x, y, float32=True, **kwargs):
+    # Scatter trace as a plain dict with typed-array x/y; x is epoch ms for a date axis,
+    # either raw dates or an array already built by encode_dates
+    if not isinstance(x, dict):
+        x = encode_dates(x)
+    trace = {"type": "scatter", "x": x, "y": encode_array(y, float32=float32)}
+    trace.update(kwargs)
+    return trace
+
+
+def encode_frame(df, float32=False):
+    # Columnar dcc.Store payload: column order, date columns, and one typed array per column
+    return {
+        "columns": list(df.columns),
+        "dates": [column for column in df.columns if df[column].dtype.kind == "M"],
+        "data": {column: encode_array(df[column].to_numpy(), float32=float32) for column in df.columns},
+    }
+
+
+def enable_fast_json():
+    # Use orjson for figure/layout serialization when it is installed
+    try:
+        import orjson  # noqa: F401
+    except ImportError:
+        return False
+    import plotly.io as pio
+    pio.json.config.default_engine = "orjson"
+    return True
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+
+from pff_fetch import fetch_corrected_dividends
+from PFF_TNX_Table_Overview import fetch_price_history
+
+NUM_DIVIDENDS_TO_SUM = 12
+
+
+def read_holdings(path):
+    # CSV with Ticker,Shares and optionally Purchase Date for per-lot rows, e.g.
+    #   Ticker,Shares,Purchase Date
+    #   PFF,100,2021-03-15
+    #   PFF,50,2023-07-03
+    #   PGX,200,
+    holdings = pd.read_csv(path)
+    holdings['Ticker'] = holdings['Ticker'].str.strip().str.upper()
+    holdings['Shares'] = holdings['Shares'].astype(float)
+    if 'Purchase Date' not in holdings:
+        holdings['Purchase Date'] = pd.NaT
+    holdings['Purchase Date'] = pd.to_datetime(holdings['Purchase Date'])
+    return holdings[['Ticker', 'Shares', 'Purchase Date']]
+
+
+def share_matrix(holdings, dates, tickers):
+    # Shares held per (date, ticker): each lot adds its shares from its purchase date on.
+    # Lots without a purchase date count as held over the whole range.
+    dates = np.asarray(dates, dtype="datetime64[ns]")
+    columns = pd.Index(tickers).get_indexer(holdings['Ticker'])
+    purchase = holdings['Purchase Date'].to_numpy(dtype="datetime64[ns]")
+    rows = np.where(np.isnat(purchase), 0, np.searchsorted(dates, purchase, side="left"))
+    keep = (columns >= 0) & (rows < len(dates))
+
+    delta = np.zeros((len(dates) + 1, len(tickers)))
+    np.add.at(delta, (rows[keep], columns[keep]), holdings['Shares'].to_numpy()[keep])
+    return np.cumsum(delta[:-1], axis=0)
+
+
+def dividend_matrices(dividends_by_ticker, dates, tickers):
+    # Trailing-12-payment sums, and amounts going ex since the previous date (on or
+    # before it for the first date), one column per ticker
+    dates = np.asarray(dates, dtype="datetime64[ns]")
+    trailing = np.full((len(dates), len(tickers)), np.nan)
+    paid = np.zeros((len(dates), len(tickers)))
+    for k, ticker in enumerate(tickers):
+        dividends = dividends_by_ticker[ticker]
+        dividend_dates = dividends.index.values.astype("datetime64[ns]")
+        amounts = dividends.to_numpy(dtype=np.float64)
+        prefix = np.concatenate(([0.0], np.cumsum(amounts)))
+
+        paid_before = np.searchsorted(dividend_dates, dates, side="left")
+        enough = paid_before >= NUM_DIVIDENDS_TO_SUM
+        trailing[enough, k] = prefix[paid_before[enough]] - prefix[paid_before[enough] - NUM_DIVIDENDS_TO_SUM]
+
+        paid_through = np.searchsorted(dividend_dates, dates, side="right")
+        received = prefix[paid_through]
+        paid[:, k] = np.diff(received, prepend=prefix[paid_before[:1]])
+    return trailing, paid
+
+
+class Portfolio:
+    def __init__(self, holdings, start_date="2023-01-01"):
+        self.holdings = holdings
+        self.tickers = list(dict.fromkeys(holdings['Ticker']))
+        self.dividends = {ticker: fetch_corrected_dividends(ticker) for ticker in self.tickers}
+
+        closes = {}
+        for ticker in self.tickers:
+            prices = fetch_price_history(ticker, start_date)
+            closes[ticker] = prices.set_index(prices['Date'].dt.tz_localize(None))['Close']
+        close_df = pd.DataFrame(closes).sort_index().ffill()
+
+        self.dates = close_df.index.values.astype("datetime64[ns]")
+        self.closes = close_df.to_numpy(dtype=np.float64)
+        self.trailing, self.paid = dividend_matrices(self.dividends, self.dates, self.tickers)
+        self.shares = share_matrix(holdings, self.dates, self.tickers)
+
+    def set_holdings(self, holdings):
+        # Only the share matrix depends on holdings; prices and dividends are reused
+        new_tickers = [ticker for ticker in dict.fromkeys(holdings['Ticker']) if ticker not in self.tickers]
+        if new_tickers:
+            raise ValueError(f"Unknown tickers {new_tickers}; build a new Portfolio to add them")
+        self.holdings = holdings
+        self.shares = share_matrix(holdings, self.dates, self.tickers)
+
+    def update_prices(self, date, latest_closes):
+        # Add (or overwrite) one day of closes without refetching history
+        date = np.datetime64(pd.Timestamp(date).normalize(), "ns")
+        row = np.array([latest_closes.get(ticker, np.nan) for ticker in self.tickers])
+        if len(self.dates) and date == self.dates[-1]:
+            self.closes[-1] = np.where(np.isnan(row), self.closes[-1], row)
+            return
+        row = np.where(np.isnan(row), self.closes[-1], row)
+        self.dates = np.append(self.dates, date)
+        self.closes = np.vstack((self.closes, row))
+        trailing, paid = dividend_matrices(self.dividends, self.dates[-2:], self.tickers)
+        self.trailing = np.vstack((self.trailing, trailing[-1:]))
+        self.paid = np.vstack((self.paid, paid[-1:]))
+        self.shares = np.vstack((self.shares, share_matrix(self.holdings, self.dates[-1:], self.tickers)))
+
+    def entitled_shares(self):
+        # Shares held at the close before each date. A dividend going ex on a date is paid
+        # to the previous day's holders, so a lot bought on the ex-date does not receive it
+        # (the same rule as DividendIndex.between in pff_lots).
+        previous = np.concatenate(([self.dates[0] - np.timedelta64(1, "ns")], self.dates[:-1]))
+        return share_matrix(self.holdings, previous, self.tickers)
+
+    def summary(self):
+        # Value-weighted trailing yield: trailing annual income over market value.
+        # Holdings without 12 payments of history are left out of both sides.
+        has_history = ~np.isnan(self.trailing)
+        value = self.shares * np.nan_to_num(self.closes)
+        income = np.where(has_history, self.shares * np.nan_to_num(self.trailing), 0.0)
+        covered_value = np.where(has_history, value, 0.0).sum(axis=1)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            portfolio_yield = income.sum(axis=1) / covered_value * 100
+
+        return pd.DataFrame({
+            "Date": self.dates,
+            "Market Value": value.sum(axis=1),
+            "Trailing Income": income.sum(axis=1),
+            "Dividend Yield": portfolio_yield,
+            "Dividends Received": (self.entitled_shares() * self.paid).sum(axis=1),
+        })
+
+    def weights(self):
+        # Latest market-value weight per holding
+        value = self.shares[-1] * np.nan_to_num(self.closes[-1])
+        return pd.Series(value / value.sum(), index=self.tickers, name="Weight")
+
+
+if __name__ == "__main__":
+    import sys
+
+    holdings = read_holdings(sys.argv[1] if len(sys.argv) > 1 else "holdings.csv")
+    portfolio = Portfolio(holdings)
+    summary = portfolio.summary()
+    print(portfolio.weights().round(4))
+    print(summary.tail(10).to_string(index=False, float_format=lambda value: f"{value:.2f}"))
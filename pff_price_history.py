@@ -1,11 +1,12 @@
-import yfinance as yf
 import pandas as pd
 
+from pff_dataset import write_bars
+from pff_fetch import fetch_history
+
 
 def fetch_price_history(ticker="PFF"):
     # Fetch historical price data for PFF using yfinance
-    pff = yf.Ticker(ticker)
-    price_history = pff.history(period="1y", interval="1d", auto_adjust = False)  # Last 20 days
+    price_history = fetch_history(ticker, period="1y", interval="1d", auto_adjust = False)  # Last year
 
     # Keep only the 'Close' prices
     price_history = price_history[['Close']]
@@ -21,3 +22,5 @@ if __name__ == "__main__":
     print(price_history_df)
     # Save the price history to a CSV file
     price_history_df.to_csv('PFF_Price_History.csv', index=False)
+    # Also store it in the partitioned dataset for date-range reads
+    write_bars(price_history_df, "PFF")
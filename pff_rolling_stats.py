@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+
+from pff_fetch import download, fetch_corrected_dividends, fetch_history
+from pff_yield_series import trailing_yield_series
+
+DEFAULT_WINDOWS = (21, 63, 126, 252)
+
+
+def _window_sums(values, window):
+    # Sum over every trailing window from one cumulative sum: O(n) regardless of window
+    cumsum = np.cumsum(values, axis=0)
+    sums = cumsum[window - 1:].copy()
+    sums[1:] -= cumsum[:-window]
+    return sums
+
+
+def rolling_regression(x, Y, window, min_periods=None):
+    # Rolling correlation, beta and residual volatility of every column of Y against x.
+    # x has shape (n,), Y has shape (n, k); results have shape (n, k) with NaN warm-up rows.
+    # Rows where x or a column of Y is NaN are left out of that column's windows; a
+    # window needs min_periods usable rows (default: all of them, as in pandas).
+    x = np.asarray(x, dtype=np.float64)
+    Y = np.asarray(Y, dtype=np.float64)
+    if Y.ndim == 1:
+        Y = Y[:, None]
+    n, k = Y.shape
+    min_periods = window if min_periods is None else max(2, min_periods)
+    result = {name: np.full((n, k), np.nan) for name in ("corr", "beta", "resid_vol")}
+    if window < 2 or n < window:
+        return result
+
+    # Centering first keeps the sum-of-squares formulas numerically stable; unusable
+    # rows are zero-filled so they add nothing to the cumulative sums, and the
+    # per-window counts replace the fixed window length
+    valid = np.isfinite(x)[:, None] & np.isfinite(Y)
+    counts = np.maximum(valid.sum(axis=0), 1)
+    x_mean = np.where(valid, x[:, None], 0.0).sum(axis=0) / counts
+    y_mean = np.where(valid, Y, 0.0).sum(axis=0) / counts
+    Xc = np.where(valid, x[:, None] - x_mean, 0.0)
+    Yc = np.where(valid, Y - y_mean, 0.0)
+    m = _window_sums(valid.astype(np.float64), window)
+    sx = _window_sums(Xc, window)
+    sy = _window_sums(Yc, window)
+    sxx = _window_sums(Xc * Xc, window)
+    syy = _window_sums(Yc * Yc, window)
+    sxy = _window_sums(Xc * Yc, window)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var_x = (sxx - sx * sx / m) / (m - 1)
+        var_y = (syy - sy * sy / m) / (m - 1)
+        cov = (sxy - sx * sy / m) / (m - 1)
+        beta = cov / var_x
+        corr = cov / np.sqrt(var_x * var_y)
+        resid_var = np.clip(var_y - beta * cov, 0.0, None)
+    enough = m >= min_periods
+
+    result["corr"][window - 1:] = np.where(enough, corr, np.nan)
+    result["beta"][window - 1:] = np.where(enough, beta, np.nan)
+    result["resid_vol"][window - 1:] = np.where(enough, np.sqrt(resid_var), np.nan)
+    return result
+
+
+def rolling_stats_frame(dates, tnx_close, yields, tickers, windows=DEFAULT_WINDOWS, use_changes=True):
+    # One column per (ticker, statistic, window), e.g. "PFF Corr 63d". With use_changes the
+    # statistics are computed on daily changes, which is how tightly the yields co-move.
+    x = np.asarray(tnx_close, dtype=np.float64)
+    Y = np.asarray(yields, dtype=np.float64)
+    if Y.ndim == 1:
+        Y = Y[:, None]
+    if use_changes:
+        x = np.diff(x)
+        Y = np.diff(Y, axis=0)
+        dates = np.asarray(dates)[1:]
+
+    columns = {"Date": dates}
+    for window in windows:
+        stats = rolling_regression(x, Y, window)
+        for i, ticker in enumerate(tickers):
+            columns[f"{ticker} Corr {window}d"] = stats["corr"][:, i]
+            columns[f"{ticker} Beta {window}d"] = stats["beta"][:, i]
+            columns[f"{ticker} Resid Vol {window}d"] = stats["resid_vol"][:, i]
+    return pd.DataFrame(columns)
+
+
+def aligned_yields(tickers, tnx, start_date="2023-01-01"):
+    # Yield series for several tickers and the TNX close, inner-joined on common dates.
+    # Each ticker's dividends carry only that ticker's corrections.
+    merged_df = tnx[['Date', 'Close']].rename(columns={'Close': 'TNX Close'})
+    for ticker in tickers:
+        dividends = fetch_corrected_dividends(ticker)
+        prices = fetch_history(ticker, start=start_date, end=pd.Timestamp.today(), auto_adjust=False)
+        dates = prices.index.tz_localize(None)
+        yield_df = trailing_yield_series(dividends, dates, prices['Close']).to_frame()
+        yield_df = yield_df.rename(columns={'Dividend Yield': ticker})
+        merged_df = pd.merge(merged_df, yield_df, on='Date', how='inner')
+    return merged_df
+
+
+def latest_stats_table(stats_df, ticker="PFF", windows=DEFAULT_WINDOWS):
+    # Latest value of each statistic per window, shaped like the comparison table
+    latest = stats_df.iloc[-1]
+    return pd.DataFrame({
+        "Window": [f"{window}d" for window in windows],
+        "Correlation": [round(latest[f"{ticker} Corr {window}d"], 2) for window in windows],
+        "Beta": [round(latest[f"{ticker} Beta {window}d"], 2) for window in windows],
+        "Residual Vol": [round(latest[f"{ticker} Resid Vol {window}d"], 3) for window in windows],
+    })
+
+
+if __name__ == "__main__":
+    # Several preferred-stock ETFs against TNX in one pass, one table per ticker
+    tickers = ["PFF", "PGX", "PFFD"]
+    tnx = download(['^TNX'], period='2y', auto_adjust=True)
+    tnx.reset_index(inplace=True)
+
+    merged_df = aligned_yields(tickers, tnx)
+    stats_df = rolling_stats_frame(merged_df['Date'], merged_df['TNX Close'], merged_df[tickers], tickers)
+    for ticker in tickers:
+        print(ticker)
+        print(latest_stats_table(stats_df, ticker).to_string(index=False))
@@ -0,0 +1,164 @@
+import fcntl
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# Snapshot layout under the store root:
+#   CURRENT            name of the live snapshot directory (swapped atomically)
+#   refresh.lock       held by the single process doing a refresh
+#   snap-<ns>/         one .npy file per column plus meta.json
+# Readers memory-map the .npy files, so every worker shares the same page-cache
+# copy of the data instead of holding its own.
+DEFAULT_ROOT = os.path.join("cache", "dashboard")
+
+logger = logging.getLogger("pff_shared_cache")
+
+
+class Snapshot:
+    __slots__ = ("name", "created", "frame", "meta")
+
+    def __init__(self, name, created, frame, meta):
+        self.name = name
+        self.created = created
+        self.frame = frame
+        self.meta = meta
+
+    def age(self):
+        return time.time() - self.created
+
+
+class SnapshotStore:
+    def __init__(self, root=DEFAULT_ROOT, keep=2):
+        self.root = root
+        self.keep = keep
+        self.current = None
+        self.refresh_thread = None
+        self.last_attempt = 0.0
+        self.last_failure = None
+        self.thread_lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        # A forked worker gets no copy of the parent's refresh thread, so it must not
+        # inherit the parent's retry timer either
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset_refresh_state)
+
+    def _reset_refresh_state(self):
+        self.refresh_thread = None
+        self.last_attempt = 0.0
+        self.thread_lock = threading.Lock()
+
+    def _pointer_path(self):
+        return os.path.join(self.root, "CURRENT")
+
+    def _current_name(self):
+        try:
+            with open(self._pointer_path()) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def load(self):
+        # Cheap when nothing changed: one small file read, then the cached mapping is reused
+        for _ in range(3):
+            name = self._current_name()
+            if name is None:
+                return None
+            if self.current is not None and self.current.name == name:
+                return self.current
+            try:
+                return self._open(name)
+            except FileNotFoundError:
+                # Pruned after CURRENT was read (a writer moved on twice meanwhile);
+                # re-read the pointer
+                continue
+        # Still racing a fast writer: keep serving what this process already has mapped
+        return self.current
+
+    def _open(self, name):
+        snapshot_dir = os.path.join(self.root, name)
+        with open(os.path.join(snapshot_dir, "meta.json")) as f:
+            meta = json.load(f)
+        columns = {
+            column: np.load(os.path.join(snapshot_dir, f"{index}.npy"), mmap_mode="r")
+            for index, column in enumerate(meta["columns"])
+        }
+        frame = pd.DataFrame(columns, copy=False)
+        self.current = Snapshot(name, meta["created"], frame, meta["data"])
+        return self.current
+
+    def write(self, frame, data):
+        # Write into a fresh directory, then swap the CURRENT pointer in one rename
+        created = time.time()
+        name = f"snap-{time.time_ns()}"
+        snapshot_dir = os.path.join(self.root, name)
+        os.makedirs(snapshot_dir)
+        for index, column in enumerate(frame.columns):
+            np.save(os.path.join(snapshot_dir, f"{index}.npy"), frame[column].to_numpy())
+        with open(os.path.join(snapshot_dir, "meta.json"), "w") as f:
+            json.dump({"created": created, "columns": list(frame.columns), "data": data}, f, default=float)
+
+        tmp_pointer = self._pointer_path() + ".tmp"
+        with open(tmp_pointer, "w") as f:
+            f.write(name)
+        os.replace(tmp_pointer, self._pointer_path())
+        self._prune()
+        return name
+
+    def _prune(self):
+        # Workers still mapping an older snapshot keep their pages after unlink
+        snapshots = sorted(entry for entry in os.listdir(self.root) if entry.startswith("snap-"))
+        for name in snapshots[:-self.keep]:
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+
+    def refresh(self, compute, max_age, block=False):
+        # Only one process runs compute(); the rest keep serving the current snapshot.
+        # When there is no snapshot at all, callers wait for the writer instead.
+        snapshot = self.load()
+        if snapshot is not None and snapshot.age() < max_age:
+            return snapshot
+
+        with open(os.path.join(self.root, "refresh.lock"), "w") as lock_file:
+            flags = fcntl.LOCK_EX if (block or snapshot is None) else fcntl.LOCK_EX | fcntl.LOCK_NB
+            try:
+                fcntl.flock(lock_file, flags)
+            except BlockingIOError:
+                return snapshot
+            try:
+                # Another process may have refreshed while we waited for the lock
+                snapshot = self.load()
+                if snapshot is not None and snapshot.age() < max_age:
+                    return snapshot
+                frame, data = compute()
+                self.write(frame, data)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return self.load()
+
+    def refresh_in_background(self, compute, max_age, retry_interval=60):
+        # At most one refresh thread per process; the file lock still limits it to one per host.
+        # Failed refreshes are retried no more often than retry_interval seconds.
+        with self.thread_lock:
+            if self.refresh_thread is not None and self.refresh_thread.is_alive():
+                return False
+            if time.monotonic() - self.last_attempt < retry_interval:
+                return False
+            self.last_attempt = time.monotonic()
+            self.refresh_thread = threading.Thread(target=self._background_refresh, args=(compute, max_age),
+                                                   daemon=True)
+            self.refresh_thread.start()
+            return True
+
+    def _background_refresh(self, compute, max_age):
+        # last_failure is the wall-clock time of the latest failed attempt in this process
+        try:
+            self.refresh(compute, max_age)
+            self.last_failure = None
+        except Exception:
+            self.last_failure = time.time()
+            logger.exception("Background snapshot refresh failed")
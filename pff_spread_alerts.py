@@ -0,0 +1,221 @@
+import json
+import logging
+import random
+import time
+import urllib.request
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from pff_fetch import download, fetch_corrected_dividends
+from PFF_TNX_Table_Overview import (
+    fetch_price_history,
+    fetch_tnx_data,
+    calculate_yield_from_date,
+)
+
+logger = logging.getLogger("pff_spread_alerts")
+
+TNX_TICKER = "^TNX"
+NUM_DIVIDENDS_TO_SUM = 12
+
+# Default thresholds per watched ticker. "spread_above"/"spread_below" are absolute
+# levels in percentage points, "percentile_band" is checked against the rolling history.
+DEFAULT_THRESHOLDS = {
+    "PFF": {"spread_above": 2.5, "spread_below": 1.5, "percentile_band": (5, 95)},
+}
+
+
+def log_sink(alert):
+    # Write the alert to the standard logger
+    logger.warning("%s %s: spread %.2f (%s)", alert["time"], alert["ticker"], alert["spread"], alert["reason"])
+
+
+class FileSink:
+    # Append alerts as JSON lines to a local file
+    def __init__(self, path="spread_alerts.jsonl"):
+        self.path = path
+
+    def __call__(self, alert):
+        with open(self.path, "a") as f:
+            f.write(json.dumps(alert) + "\n")
+
+
+class WebhookSink:
+    # POST alerts as JSON to a local endpoint (stand-in for a chat/webhook integration)
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self, alert):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(alert).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            urllib.request.urlopen(request, timeout=self.timeout).close()
+        except OSError as exc:
+            logger.error("Webhook delivery failed: %s", exc)
+
+
+class TickerState:
+    __slots__ = ("ticker", "thresholds", "dividend_sum", "history", "history_date", "zone", "last_spread")
+
+    def __init__(self, ticker, thresholds, history_length):
+        self.ticker = ticker
+        self.thresholds = thresholds
+        self.dividend_sum = None
+        # One spread per trading day; history_date is the day of the newest slot
+        self.history = deque(maxlen=history_length)
+        self.history_date = None
+        self.zone = None
+        self.last_spread = None
+
+
+class SpreadWatcher:
+    def __init__(self, thresholds=None, sinks=(log_sink,), poll_interval=300,
+                 history_length=252, dividend_refresh_interval=6 * 3600,
+                 backoff_base=5, backoff_cap=900, seed_start_date=None):
+        thresholds = thresholds or DEFAULT_THRESHOLDS
+        self.states = {ticker: TickerState(ticker, conf, history_length) for ticker, conf in thresholds.items()}
+        self.sinks = list(sinks)
+        self.poll_interval = poll_interval
+        self.dividend_refresh_interval = dividend_refresh_interval
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.seed_start_date = seed_start_date or (pd.Timestamp.today() - pd.DateOffset(years=1)).strftime("%Y-%m-%d")
+        self.last_dividend_refresh = 0.0
+        self.failures = 0
+
+    def seed(self):
+        # Fill the rolling spread history from the existing daily yield computation
+        tnx = fetch_tnx_data()
+        tnx_df = tnx[['Date', 'Close']].rename(columns={'Close': 'TNX Close'})
+        for state in self.states.values():
+            dividends = fetch_corrected_dividends(state.ticker)
+            prices = fetch_price_history(state.ticker, self.seed_start_date)
+            yield_df = calculate_yield_from_date(dividends, prices).to_frame()
+            if yield_df.empty:
+                continue
+            merged_df = pd.merge(yield_df, tnx_df, on='Date', how='inner')
+            spreads = (merged_df['Dividend Yield'] - merged_df['TNX Close']).to_numpy()
+            # A retried seed replaces, rather than repeats, a partial earlier one
+            state.history.clear()
+            state.history.extend(spreads[-state.history.maxlen:].tolist())
+            state.history_date = merged_df['Date'].iloc[-1].normalize()
+        self.refresh_dividends()
+
+    def refresh_dividends(self):
+        # The trailing dividend sum only changes on ex-dates, so it is cached between polls
+        today = pd.Timestamp.today().normalize()
+        for state in self.states.values():
+            dividends = fetch_corrected_dividends(state.ticker)
+            relevant_dividends = dividends[dividends.index < today].tail(NUM_DIVIDENDS_TO_SUM)
+            if len(relevant_dividends) == NUM_DIVIDENDS_TO_SUM:
+                state.dividend_sum = float(relevant_dividends.sum())
+        self.last_dividend_refresh = time.monotonic()
+
+    def fetch_latest(self):
+        # One batched download for every watched ticker plus the benchmark
+        tickers = list(self.states) + [TNX_TICKER]
+        data = download(tickers, ttl=0, period="5d", interval="1d", auto_adjust=False, progress=False)
+        closes = data['Close'].ffill().iloc[-1]
+        return {ticker: float(closes[ticker]) for ticker in tickers if not np.isnan(closes[ticker])}
+
+    def update(self, latest, today=None):
+        tnx_close = latest.get(TNX_TICKER)
+        if tnx_close is None:
+            return []
+        today = pd.Timestamp.today().normalize() if today is None else pd.Timestamp(today).normalize()
+        alerts = []
+        for state in self.states.values():
+            price = latest.get(state.ticker)
+            if price is None or state.dividend_sum is None:
+                continue
+            spread = state.dividend_sum / price * 100 - tnx_close
+            alert = self.check(state, spread)
+            state.last_spread = spread
+            # Intraday polls overwrite today's slot so the band stays a daily history
+            if state.history and state.history_date == today:
+                state.history[-1] = spread
+            else:
+                state.history.append(spread)
+                state.history_date = today
+            if alert is not None:
+                alerts.append(alert)
+        return alerts
+
+    def check(self, state, spread):
+        thresholds = state.thresholds
+        zone = "normal"
+        reason = None
+        if "spread_above" in thresholds and spread > thresholds["spread_above"]:
+            zone, reason = "above", f"spread above {thresholds['spread_above']}"
+        elif "spread_below" in thresholds and spread < thresholds["spread_below"]:
+            zone, reason = "below", f"spread below {thresholds['spread_below']}"
+        elif "percentile_band" in thresholds and len(state.history) >= 20:
+            low_pct, high_pct = thresholds["percentile_band"]
+            low, high = np.percentile(np.fromiter(state.history, dtype=float), [low_pct, high_pct])
+            if spread > high:
+                zone, reason = "high_band", f"spread above {high_pct}th percentile ({high:.2f})"
+            elif spread < low:
+                zone, reason = "low_band", f"spread below {low_pct}th percentile ({low:.2f})"
+
+        # Only fire when the spread moves into a new zone, not on every poll
+        previous_zone, state.zone = state.zone, zone
+        if reason is None or zone == previous_zone:
+            return None
+        return {
+            "time": pd.Timestamp.now().isoformat(timespec="seconds"),
+            "ticker": state.ticker,
+            "spread": round(spread, 4),
+            "zone": zone,
+            "reason": reason,
+        }
+
+    def emit(self, alert):
+        for sink in self.sinks:
+            try:
+                sink(alert)
+            except Exception:
+                logger.exception("Alert sink %r failed", sink)
+
+    def backoff_delay(self):
+        # Exponential backoff with equal jitter (50-100% of the delay) so restarted
+        # watchers do not retry in lockstep
+        delay = min(self.backoff_cap, self.backoff_base * 2 ** (self.failures - 1))
+        return random.uniform(0.5, 1.0) * delay
+
+    def poll_once(self):
+        if time.monotonic() - self.last_dividend_refresh > self.dividend_refresh_interval:
+            self.refresh_dividends()
+        for alert in self.update(self.fetch_latest()):
+            self.emit(alert)
+
+    def run(self, max_polls=None):
+        # Seeding goes through the same backoff as polling, so a provider outage at
+        # startup is retried instead of ending the watcher
+        seeded = False
+        polls = 0
+        while max_polls is None or polls < max_polls:
+            try:
+                if not seeded:
+                    self.seed()
+                    seeded = True
+                self.poll_once()
+                self.failures = 0
+                delay = self.poll_interval
+            except Exception as exc:
+                self.failures += 1
+                delay = self.backoff_delay()
+                logger.error("Poll failed (%s), retrying in %.0fs", exc, delay)
+            polls += 1
+            time.sleep(delay)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    watcher = SpreadWatcher(sinks=[log_sink, FileSink("spread_alerts.jsonl")])
+    watcher.run()
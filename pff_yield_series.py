@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+
+# Column labels used by the scripts when they print or tabulate yield results
+DATE = "Date"
+CLOSING_PRICE = "Closing Price"
+DIVIDEND_SUM = "Sum of Last 12 Dividends"
+DIVIDEND_YIELD = "Dividend Yield"
+
+NUM_DIVIDENDS_TO_SUM = 12
+
+
+class YieldSeries:
+    # Columnar result of the calculate_yield_* functions. Each column is one contiguous
+    # numpy array; rows are only materialized when iterated.
+    __slots__ = ("dates", "yields", "closes", "dividend_sums")
+
+    def __init__(self, dates, yields, closes=None, dividend_sums=None):
+        self.dates = np.asarray(dates, dtype="datetime64[ns]")
+        self.yields = np.asarray(yields, dtype=np.float64)
+        self.closes = None if closes is None else np.asarray(closes, dtype=np.float64)
+        self.dividend_sums = None if dividend_sums is None else np.asarray(dividend_sums, dtype=np.float64)
+
+    def columns(self):
+        columns = {DATE: self.dates}
+        if self.closes is not None:
+            columns[CLOSING_PRICE] = self.closes
+        if self.dividend_sums is not None:
+            columns[DIVIDEND_SUM] = self.dividend_sums
+        columns[DIVIDEND_YIELD] = self.yields
+        return columns
+
+    def __len__(self):
+        return len(self.dates)
+
+    def __getitem__(self, label):
+        return self.columns()[label]
+
+    def __iter__(self):
+        return self.rows()
+
+    def rows(self):
+        # Lazy row view in the same shape as the old per-row dicts
+        columns = self.columns()
+        for i in range(len(self)):
+            row = {label: values[i] for label, values in columns.items()}
+            row[DATE] = pd.Timestamp(row[DATE])
+            yield row
+
+    def to_frame(self):
+        # The DataFrame wraps the existing arrays instead of copying them
+        return pd.DataFrame(self.columns(), copy=False)
+
+    def to_scatter(self, **kwargs):
+        import plotly.graph_objects as go
+        return go.Scatter(x=self.dates, y=self.yields, **kwargs)
+
+
+class DividendIndex:
+    # Prefix sums over the sorted dividend series, so the total paid between any two
+    # dates is two binary searches and a subtraction
+    __slots__ = ("dates", "amounts", "prefix")
+
+    def __init__(self, dividends):
+        self.dates = dividends.index.values.astype("datetime64[ns]")
+        self.amounts = dividends.to_numpy(dtype=np.float64)
+        self.prefix = np.concatenate(([0.0], np.cumsum(self.amounts)))
+
+    def paid_before(self, dates):
+        # Number of dividends with an ex-date strictly before each date
+        return np.searchsorted(self.dates, np.asarray(dates, dtype="datetime64[ns]"), side="left")
+
+    def paid_through(self, dates):
+        # Number of dividends with an ex-date on or before each date
+        return np.searchsorted(self.dates, np.asarray(dates, dtype="datetime64[ns]"), side="right")
+
+    def between(self, start, end):
+        # Per-share dividends going ex after start and on or before end. A lot bought on an
+        # ex-date does not receive that dividend, hence "after start".
+        return self.prefix[self.paid_through(end)] - self.prefix[self.paid_through(start)]
+
+    def trailing_sum(self, dates, num_dividends_to_sum=NUM_DIVIDENDS_TO_SUM, paid_before=None):
+        # The last N dividends strictly before each date; NaN without N dividends of history
+        count = self.paid_before(dates) if paid_before is None else paid_before
+        result = np.full(count.shape, np.nan)
+        enough = count >= num_dividends_to_sum
+        result[enough] = self.prefix[count[enough]] - self.prefix[count[enough] - num_dividends_to_sum]
+        return result
+
+    def window_sum(self, dates, days=365, paid_before=None):
+        # Dividends going ex in the `days` calendar days before each date, however many
+        # payments that is; NaN until the dividend history covers the whole window
+        dates = np.asarray(dates, dtype="datetime64[ns]")
+        if len(self.dates) == 0:
+            return np.full(dates.shape, np.nan)
+        count = self.paid_before(dates) if paid_before is None else paid_before
+        window_start = dates - np.timedelta64(days, "D")
+        result = self.prefix[count] - self.prefix[self.paid_before(window_start)]
+        return np.where(window_start >= self.dates[0], result, np.nan)
+
+    def latest(self, dates, paid_before=None):
+        # Most recent dividend strictly before each date
+        count = self.paid_before(dates) if paid_before is None else paid_before
+        if len(self.amounts) == 0:
+            return np.full(count.shape, np.nan)
+        return np.where(count > 0, self.amounts[np.maximum(count - 1, 0)], np.nan)
+
+
+def trailing_yield_series(dividends, dates, closes, num_dividends_to_sum=NUM_DIVIDENDS_TO_SUM, include_details=False):
+    # Yield on each date from the last num_dividends_to_sum dividends paid strictly
+    # before that date. Dates without enough dividend history are dropped.
+    dates = np.asarray(dates, dtype="datetime64[ns]")
+    closes = np.asarray(closes, dtype=np.float64)
+    dividend_sums = DividendIndex(dividends).trailing_sum(dates, num_dividends_to_sum)
+
+    mask = ~np.isnan(dividend_sums)
+    dividend_sums = dividend_sums[mask]
+    closes = closes[mask]
+    yields = dividend_sums / closes * 100
+
+    if include_details:
+        return YieldSeries(dates[mask], yields, closes, dividend_sums)
+    return YieldSeries(dates[mask], yields)
+
+
+# Yield definitions for yield_definitions(). Each takes the shared DividendIndex, the
+# dates, the closes and the dividends-paid-before count from the one searchsorted over
+# all dates, and returns a yield in percent (NaN where the history is too short).
+def last_n_yield(num_dividends_to_sum=NUM_DIVIDENDS_TO_SUM):
+    def definition(index, dates, closes, paid_before):
+        return index.trailing_sum(dates, num_dividends_to_sum, paid_before) / closes * 100
+    return definition
+
+
+def calendar_window_yield(days=365):
+    def definition(index, dates, closes, paid_before):
+        return index.window_sum(dates, days, paid_before) / closes * 100
+    return definition
+
+
+def annualized_latest_yield(payments_per_year=12):
+    def definition(index, dates, closes, paid_before):
+        return index.latest(dates, paid_before) * payments_per_year / closes * 100
+    return definition
+
+
+def sec_style_yield(index, dates, closes, paid_before):
+    # SEC 30-day yield formula, 2 * ((a - b) / (c * d) + 1) ** 6 - 1, with the latest
+    # monthly distribution standing in for 30 days of net investment income per share
+    # (a - b) / c, since fund income and expense figures are not available here
+    income = index.latest(dates, paid_before)
+    return 2 * ((income / closes + 1) ** 6 - 1) * 100
+
+
+YIELD_DEFINITIONS = {
+    "Last 12 Payments": last_n_yield(NUM_DIVIDENDS_TO_SUM),
+    "365 Day": calendar_window_yield(365),
+    "Latest x12": annualized_latest_yield(12),
+    "SEC-Style": sec_style_yield,
+}
+
+
+def yield_definitions(dividends, dates, closes, definitions=None):
+    # Every definition side by side, one column each, from a single dividend index
+    # and a single search over the price dates
+    definitions = YIELD_DEFINITIONS if definitions is None else definitions
+    index = dividends if isinstance(dividends, DividendIndex) else DividendIndex(dividends)
+    dates = np.asarray(dates, dtype="datetime64[ns]")
+    closes = np.asarray(closes, dtype=np.float64)
+    paid_before = index.paid_before(dates)
+
+    columns = {DATE: dates, CLOSING_PRICE: closes}
+    for label, definition in definitions.items():
+        columns[label] = definition(index, dates, closes, paid_before)
+    return pd.DataFrame(columns, copy=False)